@@ -3,9 +3,40 @@ Program to verify whether the assignment produces by the solver
 satisfies the input problem file.
 """
 
+import bz2
+import gzip
 import json
+import lzma
 import sys
 
+# Magic bytes and openers of the compressed formats
+# accepted for the input file
+COMPRESSED_FORMATS = [
+    (b"\x1f\x8b", gzip.open),
+    (b"\xfd7zXZ\x00", lzma.open),
+    (b"BZh", bz2.open),
+]
+
+def open_input_file(input_file_name):
+    """
+    Method opens the input file for reading text.
+    Files compressed with gzip, xz or bzip2 are recognized
+    by their magic bytes and decompressed on the fly, so
+    the file is never unpacked in full.
+
+    Parameters:
+        input_file_name: Name of the (possibly compressed) input file
+
+    Return:
+        a text file object
+    """
+    with open(input_file_name,"rb") as input_file:
+        magic = input_file.read(8)
+    for format_magic, opener in COMPRESSED_FORMATS:
+        if magic.startswith(format_magic):
+            return opener(input_file_name,"rt")
+    return open(input_file_name,"r")
+
 def check_validity(input_file_name,assgn_dict):
     """
     Method takes in a input file having a SAT problem and
@@ -23,19 +54,23 @@ def check_validity(input_file_name,assgn_dict):
         is not a satisfying assignment
     """
 
-    # Open the input file
-    input_file = open(input_file_name,"r")
+    # Open the input file (plain or compressed)
+    input_file = open_input_file(input_file_name)
     
     # Value to be returned
     is_correct = True
 
-    # For all lines in the file
-    for line in input_file.readlines():
+    # For all lines in the file, read one at a time
+    for line in input_file:
         # Remove trailing characters at the end of the line using rstrip
         line = line.rstrip()
         
         # Split the line with space as delimiter
         line = line.split()
+
+        if not line:
+            # Skip the blank lines
+            continue
         
         # First word of the line
         first_word = line[0]
@@ -2,64 +2,199 @@ import os
 import sys
 import time
 import json
+from arena import ClauseArena, LEARNED, DELETED
+from clause_db import LearnedClauseDB
 from decider import Decider
+from dimacs import DimacsParser, strip_cnf_extension
+from elimination import VariableEliminator
+from reconstruction import ReconstructionStack
+from inprocessing import Inprocessor
+from probing import Prober
 from restarter import Restarter
-from collections import OrderedDict
+from subsumption import Subsumer
+from blocked import BlockedClauseEliminator
 from utils import Statistics
 
-class AssignedNode:
-    """
-    Class used to store the information about the variables being assigned.
+# conflicts between two checks of the stop event of a portfolio worker
+STOP_CHECK_INTERVAL = 256
 
-    Attributes:
-        var: variable that is assigned
-        value: value assigned to the variable (True/False)
-        level: level (decision level in the tree) at which the variable is assigned
-        clause: The id of the clause which implies this decision (If this is assigned through implication)
-        index: The index in the assignment list at which this node is pushed
+def write_results(cnf_filename, stats, assignment_dict=None):
+    ''' Store the statistics, and the satisfying assignment if the result is SAT, as files in Results/ '''
+    if not os.path.isdir("Results"):
+        os.mkdir("Results")
 
-    """
+    # Extracts test case name from the base file name
+    # eg. bmc-1 from bmc-1.cnf or bmc-1.cnf.gz
+    input_case_name = strip_cnf_extension(cnf_filename)
 
-    def __init__(self, var, value, level, clause):
-        self.var = var
-        self.value = value
-        self.level = level
-        self.clause = clause
-        self.index = -1
+    # Create the filename for stats file
+    # eg. Results/stats_bmc-1.txt
+    stats_file_name = "Results/stats_" + input_case_name + ".txt"
+
+    stats._output_statistics_file = stats_file_name
+
+    original_stdout = sys.stdout
+    sys.stdout = open(stats_file_name, "wt")
+    stats.print_stats()
+    sys.stdout = original_stdout
+
+    if stats._result == "SAT":
+        assgn_file_name = "Results/assgn_" + input_case_name + ".txt"
+        stats._output_assignment_file = assgn_file_name
+
+        # the assignment file
+        assgn_file = open(assgn_file_name, "w")
+        assgn_file.write(json.dumps(assignment_dict))
+        assgn_file.close()
 
 
 class SAT:
-    def __init__(self, decider="VSIDS", restarter="NO_RESTART", bve_flag="False", base=1024):
+    def __init__(self, decider="VSIDS", restarter="NO_RESTART", bve_flag="False", base=1024, cache=None,
+                 minimize="True", bin_minimize="False", reduce_interval=2000, vsids_decay=0, subsume="False",
+                 probe="False", inprocess="False", bce="False", simplify="True", seed=0):
         '''
         Constructor for the SAT class
 
         Parameters:
-            decider: the init decision heuristic used, should be of ["VSIDS","LRB","CHB"], default is "VSIDS"
-            restarter: the restart strategy to be used, should be of ["GEOMETRIC","LUBY","NO_RESTART"], default is "NO_RESTART"
+            decider: the init decision heuristic used, should be of ["VSIDS","LRB","CHB","VMTF"], default is "VSIDS"
+            restarter: the restart strategy to be used, should be of ["GEOMETRIC","LUBY","GLUCOSE","NO_RESTART"], default is "NO_RESTART"
+            cache: a `FormulaCache` holding the parsed formulas, None to always parse the input file
+            minimize: "True" to minimize the learned clauses recursively
+            bin_minimize: "True" to strengthen the learned clauses with the binary implication lists
+            reduce_interval: number of conflicts before the first reduction of the learned clauses, 0 to keep them all
+            vsids_decay: the decay factor of EVSIDS in (0, 1), 0 for the additive VSIDS increment
+            subsume: "True" to subsume and strengthen the clauses before the search, and the learned clauses
+                at every reduction of the learned clause database
+            probe: "True" to substitute the equivalent literals and probe the failed literals before the search
+            inprocess: "True" to simplify the formula periodically during the search (see `Inprocessor`)
+            bce: "True" to remove the blocked clauses before the search (see `BlockedClauseEliminator`)
+            simplify: "True" to simplify the clauses with the new level 0 assignments during the search (see `simplify()`)
+            seed: a non zero seed randomizes the initial phases and score ties of the decider
         '''
         self._num_clauses = 0
         self._num_vars = 0
         self._level = 0
-        self.sentence = {}
-        # a dict: lit -> List[clause]
-        self.clause_ptr = 0
-        self.orig_sentence = {}
-        self.l2c_watch = {}
-        # a dict: clause -> [lit1, lit2]
-        self.c2l_watch = {}
-        # a dict to store the assignnode, with (var,node) as (key,value)
-        self.v2a_watch = {}
-        # a list store the node in the order of their assignment
-        self._assignment = []
+        # all the clauses, original and learned, indexed by clause id
+        self.sentence = ClauseArena()
+        self.orig_sentence = None
+        self.assignment_dict = None
+        # indexed by literal: the literals implied by the binary clauses holding the literal,
+        # when it becomes False
+        self.bin_watch = []
+        # indexed by literal: the clauses (with more than 2 literals) watching the literal, as a flat list of
+        # (clause id, blocker literal) pairs. The blocker is another literal of the clause,
+        # if it is True the clause is satisfied and need not be visited.
+        # The two watched literals of a clause are kept at its positions 0 and 1
+        self.l2c_watch = []
+        # assignment state, see `init_assignment()`
+        self._values = []
+        self._var_level = []
+        self._var_reason = []
+        self._trail_pos = []
+        self._trail = []
+        self._trail_size = 0
+        self._trail_lim = []
+        self._qhead = 0
+        self._bin_qhead = 0
+        self._seen = []
+        # the literals and the id (None for a binary clause) of the clause found conflicting by `bcp()`
+        self._conflict_clause = None
+        self._conflict_clause_id = None
+        # tiers, LBDs and activities of the learned clauses
+        self._learned_db = LearnedClauseDB(reduce_interval)
         # decider to use
         self._decider = decider
+        self._vsids_decay = vsids_decay
+        self._seed = seed
         # restarter to use
         self._restarter = Restarter(restarter,decider,base)
         # the Statistics object to store basic information
         # bve flag
         self._bve_flag = bve_flag
+        # the variables removed by the elimination or the equivalent literal substitution,
+        # and the clauses needed to assign them in the model
+        self._eliminated_vars = []
+        self._reconstruction = ReconstructionStack()
+        # formula cache
+        self._cache = cache
+        # learned clause minimization flags
+        self._minimize = minimize
+        self._bin_minimize = bin_minimize
+        # subsumption flag
+        self._subsume = subsume
+        # probing flag
+        self._probe = probe
+        # blocked clause elimination flag
+        self._bce = bce
+        # level 0 simplification flag, the trail size and implications at the last one, see `simplify_due()`
+        self._simplify = simplify
+        self._simplify_assigns = 0
+        self._simplify_props = 0
+        # inprocessing scheduler, set up by `solve()` with the inprocess flag
+        self._inprocess = inprocess
+        self._inprocessor = None
+        # the event set by a `Portfolio` to stop the search of its workers, None out of a portfolio
+        self._stop = None
+        # the `ClauseExchange` of a portfolio worker sharing its learned clauses, and the ids of
+        # the imported clauses not used in a conflict analysis yet
+        self._exchange = None
+        self._imported = set()
         self.stats = Statistics()
 
+    def init_assignment(self):
+        '''
+        Allocate the assignment state once the number of variables is known.
+        The state is kept as flat arrays (struct of arrays) instead of one object per assignment:
+
+            _values: indexed by literal, 1 if the literal is True, 0 if False, -1 if unassigned
+                     (so _values[var] is the value of the variable var)
+            _var_level: indexed by variable, the decision level at which it was assigned
+            _var_reason: indexed by variable, the reason of its assignment: None for decisions and units,
+                         the id of the implying clause, or -lit if it was implied by the binary clause
+                         made of itself and the (False) literal lit
+            _trail_pos: indexed by variable, its position in the trail
+            _trail: preallocated array of the literals set True, in the order of their assignment
+            _trail_lim: _trail_lim[l] is the trail size when decision level l+1 was opened
+            _qhead: position in the trail of the next literal to propagate through the watched clauses
+            _bin_qhead: position in the trail of the next literal to propagate through the binary clauses
+            _seen: indexed by variable, marks used by `analyze_conflict()`
+        '''
+        num_vars = self._num_vars
+        self._values = [-1] * (2 * num_vars + 1)
+        self._var_level = [0] * (num_vars + 1)
+        self._var_reason = [None] * (num_vars + 1)
+        self._trail_pos = [0] * (num_vars + 1)
+        self._trail = [0] * num_vars
+        self._trail_size = 0
+        self._trail_lim = []
+        self._qhead = 0
+        self._bin_qhead = 0
+        self._seen = [False] * (num_vars + 1)
+
+    def assign(self, lit, reason):
+        ''' Set the literal True at the current level, reason is the implying clause id (None for decisions) '''
+        num_vars = self._num_vars
+        if lit > num_vars:
+            var = lit - num_vars
+            self._values[var] = 0
+        else:
+            var = lit
+            self._values[var + num_vars] = 0
+        self._values[lit] = 1
+        self._var_level[var] = self._level
+        self._var_reason[var] = reason
+        self._trail_pos[var] = self._trail_size
+        self._trail[self._trail_size] = lit
+        self._trail_size += 1
+
+    def reason_clause(self, var):
+        ''' Return the literals of the clause which implied the (assigned) variable var '''
+        reason = self._var_reason[var]
+        if reason >= 0:
+            return self.sentence.clause(reason)
+        lit = var if self._values[var] == 1 else var + self._num_vars
+        return [lit, -reason]
+
     def is_negative_literal(self, literal):
         """ To judge whether a literal is negative """
         return literal > self._num_vars
@@ -73,131 +208,123 @@ class SAT:
     def add_clause(self, clause):
         """ 
         Method that adds clause to `self.sentence` while reading the .cnf file. 
-        Also helps to eliminate unary clauses.
-        """
-        clause = clause[:-1]
-        clause = list(OrderedDict.fromkeys(clause))
-        if len(clause) == 1:
-            lit = clause[0]
-            value_to_set = True
-
-            if lit[0] == '-':
-                value_to_set = False
-                var = int(lit[1:])
-            else:
-                var = int(lit)
-
-            if var not in self.v2a_watch:
-                self.stats._num_implications += 1
-                node = AssignedNode(var, value_to_set, 0, None)
-                self.v2a_watch[var] = node
-                self._assignment.append(node)
-                node.index = len(self._assignment) - 1
-            else:
-                node = self.v2a_watch[var]
-                if node.value != value_to_set:
-                    self.stats._result = "UNSAT"
-                    return 0
-            return 1
-
-        clause_with_literals = []
-
-        for lit in clause:
-            if lit[0] == '-':
-                var = int(lit[1:])  # lit[1:] removes '-' at start
-                clause_with_literals.append(var + self._num_vars)
-            else:
-                var = int(lit)
-                clause_with_literals.append(var)
+        Also helps to eliminate unary clauses. Tautological clauses are dropped.
 
-        clause_id = self.clause_ptr
-        self.sentence[self.clause_ptr] = clause_with_literals
-        self.clause_ptr += 1
-
-        for lit in clause_with_literals:
-            self.bve_watch.setdefault(lit, set()).add(clause_id)
+        Parameters:
+            clause: sequence of DIMACS literals (signed ints, without the ending 0)
+        """
+        num_vars = self._num_vars
+        signed_literals = set(clause)
+        for lit in signed_literals:
+            if -lit in signed_literals:
+                return 1
+        clause_with_literals = [lit if lit > 0 else num_vars - lit for lit in clause]
+        if len(signed_literals) != len(clause_with_literals):
+            clause_with_literals = list(dict.fromkeys(clause_with_literals))
+
+        if len(clause_with_literals) == 0:
+            # the empty clause can never be satisfied
+            self.stats._result = "UNSAT"
+            return 0
+
+        if len(clause_with_literals) == 1:
+            return self.add_unit(clause_with_literals[0])
+
+        self.store_clause(clause_with_literals)
+        return 1
 
+    def add_unit(self, lit):
+        """ Assign the literal of a unary clause at level 0, returns 0 if it conflicts with a previous unary clause """
+        value = self._values[lit]
+        if value == -1:
+            self.stats._num_implications += 1
+            self.assign(lit, None)
+        elif value == 0:
+            self.stats._result = "UNSAT"
+            return 0
         return 1
 
+    def store_clause(self, clause_with_literals):
+        """ Store a clause (list of literals) read from the input in `self.sentence` """
+        self.sentence.add(clause_with_literals)
+
     def init_watch(self):
-        for clause_id,clause in self.sentence.items():
-            watch_literal1 = clause[0]
-            watch_literal2 = clause[1]
-            self.c2l_watch[clause_id] = [watch_literal1, watch_literal2]
-            self.l2c_watch.setdefault(watch_literal1, []).append(clause_id)
-            self.l2c_watch.setdefault(watch_literal2, []).append(clause_id)
+        """ Watch the first two literals of every clause, binary clauses go to the implication lists """
+        self.l2c_watch = [[] for _ in range(2 * self._num_vars + 1)]
+        self.bin_watch = [[] for _ in range(2 * self._num_vars + 1)]
+        lits = self.sentence.lits
+        offsets = self.sentence.offsets
+        sizes = self.sentence.sizes
+        for clause_id in self.sentence.ids():
+            watch_literal1 = lits[offsets[clause_id]]
+            watch_literal2 = lits[offsets[clause_id] + 1]
+            if sizes[clause_id] == 2:
+                self.bin_watch[watch_literal1].append(watch_literal2)
+                self.bin_watch[watch_literal2].append(watch_literal1)
+            else:
+                self.l2c_watch[watch_literal1] += (clause_id, watch_literal2)
+                self.l2c_watch[watch_literal2] += (clause_id, watch_literal1)
 
     def read_cnf_file(self, cnf_filename):
-        """ To read from .cnf file """
-        cnf_file = open(cnf_filename, "r")
-        self.bve_watch = {}
-        for line in cnf_file.readlines():
-            line = line.rstrip()
-            line = line.split()
-            first_word = line[0]
-            if first_word == "c":
-                continue
-            elif first_word == "p":
-                self._num_vars = int(line[2])
-                self.stats._num_orig_clauses = int(line[3])
-            else:
-                ret = self.add_clause(line)
+        """ To read from .cnf file, or from the formula cache if it holds the file """
+        cached = None
+        if self._cache is not None:
+            cache_key = self._cache.key(cnf_filename)
+            cached = self._cache.load(cache_key)
+            self.stats._cache_status = "miss" if cached is None else "hit"
+
+        if cached is not None:
+            self.load_cached_formula(cached)
+        else:
+            start_time = time.time()
+            parser = DimacsParser().parse(cnf_filename)
+            self.stats._parse_time = time.time() - start_time
+            self.stats._parse_bytes = parser.num_bytes
+
+            self._num_vars = parser.num_vars
+            self.stats._num_orig_clauses = parser.num_clauses
+            self.init_assignment()
+            literals = parser.literals
+            offsets = parser.offsets
+            for i in range(parser.clause_count):
+                ret = self.add_clause(literals[offsets[i]:offsets[i + 1] - 1])
                 if ret == 0:
                     break
 
-        cnf_file.close()
-        if self._bve_flag == "True":
-            self.bve()
+            if self._cache is not None:
+                units = self._trail[:self._trail_size]
+                self._cache.store(cache_key, self._num_vars, self.stats._num_orig_clauses,
+                                  self.sentence, units, self.stats._result == "UNSAT")
+
+        # the original clauses are kept for the test, before the preprocessing changes them
         self.orig_sentence = self.sentence.copy()
+        self._reconstruction.num_vars = self._num_vars
+        if self._subsume == "True" and self.stats._result != "UNSAT":
+            self.stats._subsume_flag = True
+            Subsumer(self).run()
+        if self._bce == "True" and self.stats._result != "UNSAT":
+            self.stats._bce_flag = True
+            BlockedClauseEliminator(self).run()
+        if self._bve_flag == "True" and self.stats._result != "UNSAT":
+            self.bve()
         self.init_watch()
 
-    def is_tautological(self,clause):
-        for lit in clause:
-            if (lit > self._num_vars and lit-self._num_vars in clause) or (lit < self._num_vars and lit+self._num_vars in clause):
-                return True
+    def load_cached_formula(self, cached):
+        """ Fill the formula from a `CachedFormula` of the formula cache """
+        self._num_vars = cached.num_vars
+        self.stats._num_orig_clauses = cached.num_orig_clauses
+        self.init_assignment()
+        for lit in cached.units:
+            self.add_unit(lit)
+        for i in range(cached.num_clauses):
+            self.store_clause(cached.clause(i))
+        if cached.unsat:
+            self.stats._result = "UNSAT"
 
-        return False
-    
     def bve(self):
-        start_time = time.time()
+        """ Bounded variable elimination, see `VariableEliminator` """
         self.stats._bve_flag = True
-        clause_to_be_del = set()
-        for var in range(1,self._num_vars+1):
-            if var in self.v2a_watch:
-                continue
-            S_plus = self.bve_watch.setdefault(var,set())
-            S_minus = self.bve_watch.setdefault(var + self._num_vars,set())
-            var_total_counts = len(S_plus) + len(S_minus)
-            if var_total_counts > 6:
-                continue
-
-            new_clauses = []
-            # c1 c2 are two clause idx
-            for c1 in S_plus:
-                for c2 in S_minus:
-                    new_clause = self.binary_resolute(self.sentence[c1],self.sentence[c2],var)
-                    if self.is_tautological(new_clause):
-                        continue
-                    new_clauses.append(new_clause)
-
-            if len(new_clauses) <= var_total_counts:
-                # do elimination
-                for c1 in S_plus:
-                    clause_to_be_del.add(c1)
-                for c2 in S_minus:
-                    clause_to_be_del.add(c2)
-                for new_clause in new_clauses:
-                    self.sentence[self.clause_ptr] = new_clause
-                    self.clause_ptr += 1
-                    self.stats._bve_add_clauses += 1
-                self.stats._bve_vars += 1
-
-
-        for clause_id in clause_to_be_del:
-            self.stats._bve_rm_clauses += 1
-            del self.sentence[clause_id]
-        end_time = time.time()
-        self.stats._bve_time = end_time - start_time
+        self._eliminated_vars = VariableEliminator(self).run()
 
     """ Decide: use the Decider class! """
     def decide(self):
@@ -205,337 +332,620 @@ class SAT:
         Method that chooses an uassigned variable and assigns it with a boolean value.
         Returns -1 if there are no variables to set. Else returns the variable to assigned.
         '''
-        
         var, value_to_set = self.sat_decider.decide_var()
 
         if var == -1:
             return -1
 
         self._level += 1
+        self._trail_lim.append(self._trail_size)
         self._restarter.decisions += 1
         self._restarter.decidedVars.add(var)
 
-        new_node = AssignedNode(var, value_to_set, self._level, None)
-        self.v2a_watch[var] = new_node
-        self._assignment.append(new_node)
-        new_node.index = len(self._assignment) - 1
+        self.assign(var if value_to_set else var + self._num_vars, None)
 
         self.stats._num_decisions += 1
 
         return var
 
     """ Core Functions for CDCL """
-    def bcp(self, is_first_time):
+    def bcp(self):
         '''
-        Perform boolean constraint propogation
+        Perform boolean constraint propogation, starting from the first trail literal not propagated yet
         
-        Parameters:
-            is_first_time: Boolean which is set to True when this method is run initially and False for all other invocations
         Return:
-            "CONFLICT" or "NO_CONFLICT" depending on whether a conflict arised while making the implications or not. 
-            Returns "RESTART" depending on the number of conflicts encountered and the restart strategy used by the solver (if any)
-        '''        
-        last_assignment_pointer = len(self._assignment) - 1
+            "CONFLICT" or "NO_CONFLICT" depending on whether a conflict arised while making the implications or not,
+            and the variables implied
+        '''
+        num_vars = self._num_vars
+        values = self._values
+        trail = self._trail
+        l2c_watch = self.l2c_watch
+        lits = self.sentence.lits
+        offsets = self.sentence.offsets
+        sizes = self.sentence.sizes
 
-        if is_first_time:
-            last_assignment_pointer = 0
+        bin_watch = self.bin_watch
 
         propagated = []
-        while last_assignment_pointer < len(self._assignment):
+        blocker_hits = 0
+        clause_visits = 0
+        while self._qhead < self._trail_size:
+
+            # the binary clauses of all the pending literals are propagated first,
+            # the reason of an implication is the other literal of the clause
+            while self._bin_qhead < self._trail_size:
+                true_literal = trail[self._bin_qhead]
+                self._bin_qhead += 1
+                literal_that_is_falsed = true_literal - num_vars if true_literal > num_vars else true_literal + num_vars
+                for implied_literal in bin_watch[literal_that_is_falsed]:
+                    value = values[implied_literal]
+                    if value == 1:
+                        continue
+                    if value == -1:
+                        self.assign(implied_literal, -literal_that_is_falsed)
+                        implied_var = implied_literal - num_vars if implied_literal > num_vars else implied_literal
+                        propagated.append(implied_var)
+                        self.sat_decider.bcp_update(implied_var, implied_literal <= num_vars)
+                        self.stats._num_implications += 1
+                        self.stats._binary_implications += 1
+                    else:
+                        self.stats._blocker_hits += blocker_hits
+                        self.stats._clause_visits += clause_visits
+                        self._conflict_clause = [implied_literal, literal_that_is_falsed]
+                        self._conflict_clause_id = None
+                        return "CONFLICT", propagated
 
-            last_assigned_node = self._assignment[last_assignment_pointer]
+            true_literal = trail[self._qhead]
+            self._qhead += 1
 
-            if last_assigned_node.value is True:
-                literal_that_is_falsed = last_assigned_node.var + self._num_vars
+            if true_literal > num_vars:
+                literal_that_is_falsed = true_literal - num_vars
             else:
-                literal_that_is_falsed = last_assigned_node.var
-
-            itr = 0
-
-            clauses_watched_by_falsed_literal = self.l2c_watch.setdefault(
-                literal_that_is_falsed, []).copy()
-
-            clauses_watched_by_falsed_literal.reverse()
-
-            while itr < len(clauses_watched_by_falsed_literal):
-
-                clause_id = clauses_watched_by_falsed_literal[itr]
-                watch_list_of_clause = self.c2l_watch[clause_id]
-
-                other_watch_literal = watch_list_of_clause[0]
+                literal_that_is_falsed = true_literal + num_vars
+
+            # walk the watch list once, keeping the entries still watching the falsed
+            # literal in place: entries are read at i and written back at j
+            watch_list = l2c_watch[literal_that_is_falsed]
+            end = len(watch_list)
+            i = 0
+            j = 0
+            while i < end:
+                blocker = watch_list[i + 1]
+                if values[blocker] == 1:
+                    # satisfied by the blocker, the clause itself is not read
+                    watch_list[j] = watch_list[i]
+                    watch_list[j + 1] = blocker
+                    i += 2
+                    j += 2
+                    blocker_hits += 1
+                    continue
+
+                clause_id = watch_list[i]
+                i += 2
+                clause_visits += 1
+                offset = offsets[clause_id]
+
+                # make sure the falsed literal is at position 1
+                other_watch_literal = lits[offset]
                 if other_watch_literal == literal_that_is_falsed:
-                    other_watch_literal = watch_list_of_clause[1]
-
-                other_watch_var = self.get_var_from_literal(other_watch_literal)
-                is_negative_other = self.is_negative_literal(other_watch_literal)
-
-                if other_watch_var in self.v2a_watch:
-                    value_assgned = self.v2a_watch[
-                        other_watch_var].value
-                    if (is_negative_other and value_assgned is False) or (
-                            not is_negative_other and value_assgned is True):
-                        itr += 1
-                        continue
-                new_literal_to_watch = -1
-                clause = self.sentence[clause_id]
-
-                for lit in clause:
-                    if lit not in watch_list_of_clause:
-                        var_of_lit = self.get_var_from_literal(lit)
-
-                        if var_of_lit not in self.v2a_watch:
-                            new_literal_to_watch = lit
-                            break
-                        else:
-                            node = self.v2a_watch[var_of_lit]
-                            is_negative = self.is_negative_literal(lit)
-                            if (is_negative and node.value is False) or (
-                                    not is_negative and node.value is True):
-                                new_literal_to_watch = lit
-                                break
-
-                if new_literal_to_watch != -1:
-                    self.c2l_watch[clause_id].remove(
-                        literal_that_is_falsed)
-                    self.c2l_watch[clause_id].append(
-                        new_literal_to_watch)
-                    self.l2c_watch.setdefault(literal_that_is_falsed,
-                                                        []).remove(clause_id)
-                    self.l2c_watch.setdefault(new_literal_to_watch,
-                                                        []).append(clause_id)
-
+                    other_watch_literal = lits[offset + 1]
+                    lits[offset] = other_watch_literal
+                    lits[offset + 1] = literal_that_is_falsed
+
+                if values[other_watch_literal] == 1:
+                    watch_list[j] = clause_id
+                    watch_list[j + 1] = other_watch_literal
+                    j += 2
+                    continue
+
+                # look for a new literal to watch
+                for k in range(offset + 2, offset + sizes[clause_id]):
+                    lit = lits[k]
+                    if values[lit] != 0:
+                        lits[offset + 1] = lit
+                        lits[k] = literal_that_is_falsed
+                        l2c_watch[lit] += (clause_id, other_watch_literal)
+                        break
                 else:
-                    if other_watch_var not in self.v2a_watch:
-                        value_to_set = not is_negative_other
-                        assign_var_node = AssignedNode(other_watch_var,
-                                                    value_to_set, self._level,
-                                                    clause_id)
-                        self.v2a_watch[
-                            other_watch_var] = assign_var_node
-
-                        self._assignment.append(assign_var_node)
-                        assign_var_node.index = len(self._assignment) - 1
-
+                    # the clause is unit or conflicting, it keeps its watches
+                    watch_list[j] = clause_id
+                    watch_list[j + 1] = other_watch_literal
+                    j += 2
+
+                    if values[other_watch_literal] == -1:
+                        self.assign(other_watch_literal, clause_id)
+                        other_watch_var = other_watch_literal - num_vars if other_watch_literal > num_vars else other_watch_literal
                         propagated.append(other_watch_var)
-                        self.sat_decider.bcp_update(other_watch_var, value_to_set)
+                        self.sat_decider.bcp_update(other_watch_var, other_watch_literal <= num_vars)
                         self.stats._num_implications += 1
 
                     else:
-                        self._restarter.incre_conflict()
-                        if self._restarter.get_restart_flag():
-                            self.stats._restarts += 1
-                            return "RESTART", propagated                    
-
-                        conflict_node = AssignedNode(None, None, self._level,
-                                                    clause_id)
-                        self._assignment.append(conflict_node)
-
-                        conflict_node.index = len(self._assignment) - 1
-
+                        # conflict: keep the rest of the watch list and stop
+                        while i < end:
+                            watch_list[j] = watch_list[i]
+                            j += 1
+                            i += 1
+                        del watch_list[j:]
+                        self.stats._blocker_hits += blocker_hits
+                        self.stats._clause_visits += clause_visits
+                        self._conflict_clause = lits[offset:offset + sizes[clause_id]].tolist()
+                        self._conflict_clause_id = clause_id
                         return "CONFLICT", propagated
 
-                itr += 1
-
-            last_assignment_pointer += 1
+            del watch_list[j:]
 
+        self.stats._blocker_hits += blocker_hits
+        self.stats._clause_visits += clause_visits
         return "NO_CONFLICT", propagated
 
 
-    def binary_resolute(self, clause1, clause2, var):
-        '''
-        Method that performs binary resolution on two clauses with respect to one variable.
-        *Used in `analyze_conflict()`.
-        '''
-        full_clause = clause1 + clause2
-        full_clause = list(OrderedDict.fromkeys(full_clause))
-        full_clause.remove(var)
-        full_clause.remove(var + self._num_vars)
-        return full_clause
-
-
-    def is_valid_clause(self, clause, level):
-        '''
-        Method that checks if the passed clause is a valid conflict clause (with only one literal set at level). 
-        Also finds the latest assigned literal set at level.
-        *Used in `analyze_conflict()`.
-        '''
-        counter = 0
-        maxi = -1
-        cand = -1
-        for lit in clause:
-            var = self.get_var_from_literal(lit)
-            node = self.v2a_watch[var]
-            if node.level == level:
-                counter += 1
-                if node.index > maxi:
-                    maxi = node.index
-                    cand = node
-
-        return counter == 1, cand
-
-    def get_backtrack_level(self, conflict_clause, conflict_level):
-        '''
-        Method to get the backtrack level using the passed conflict clause and the conflict level.
-        Returns the only literal assigned at the conflict level present in the conflict clause.
-        *Used in `analyze_conflict()`.
-        '''
-        maximum_level_before_conflict_level = -1
-
-        literal_at_conflict_level = -1
-
-        for lit in conflict_clause:
-            var = self.get_var_from_literal(lit)
-            assigned_node = self.v2a_watch[var]
-            if assigned_node.level == conflict_level:
-                literal_at_conflict_level = lit
-            else:
-                if assigned_node.level > maximum_level_before_conflict_level:
-                    maximum_level_before_conflict_level = assigned_node.level
-
-        return maximum_level_before_conflict_level, literal_at_conflict_level
-
     def analyze_conflict(self):
         '''
         Analyze the conflict with first-UIP clause learning.
-        Returns the backtrack level and the assignment node implied by the conflict clause that will be used for implications in `backtrack()`
+        The conflict clause is resolved with the reasons of its literals assigned at the conflict level,
+        walking the trail backwards: a variable is marked as seen when it enters the clause, and the walk
+        stops when only one seen variable of the conflict level is left (the first UIP).
+        The variables resolved away (conflict side) and the reason variables of the learned clause,
+        used by the decider, are collected in the same pass.
+
+        Returns the backtrack level, the literal implied by the conflict clause and its reason,
+        that will be used for implications in `backtrack()`
         '''
-        assigment_stack_pointer = len(self._assignment) - 1
-        conflict_node = self._assignment[assigment_stack_pointer]
-        conflict_level = conflict_node.level
-        conflict_clause = self.sentence[conflict_node.clause]
-
-        self._assignment.pop()
+        conflict_level = self._level
 
         if conflict_level == 0:
-            return -1, None
-
+            return -1, None, None
+
+        num_vars = self._num_vars
+        seen = self._seen
+        var_level = self._var_level
+        var_reason = self._var_reason
+        trail = self._trail
+        learned_db = self._learned_db
+        learned_db.on_conflict()
+        imported = self._imported
+
+        # position 0 is kept for the UIP literal
+        learned_clause = [0]
         conflict_side = []
+        reasons = []
+        backtrack_level = 0
+        # number of seen variables of the conflict level not resolved yet
+        path_count = 0
+        resolved_var = 0
+        clause = self._conflict_clause
+        clause_id = self._conflict_clause_id
+        index = self._trail_size - 1
 
         while True:
+            if clause_id in learned_db.lbd:
+                learned_db.bump(clause_id, self.compute_lbd(clause))
+                if clause_id in imported:
+                    imported.discard(clause_id)
+                    self.stats._share_useful += 1
+            for lit in clause:
+                var = lit - num_vars if lit > num_vars else lit
+                if seen[var] or var == resolved_var:
+                    continue
+                level = var_level[var]
+                if level == 0:
+                    # False forever, it can be left out of the clause
+                    continue
+                seen[var] = True
+                if level == conflict_level:
+                    path_count += 1
+                else:
+                    learned_clause.append(lit)
+                    # keep a literal of the backtrack level at position 1, it will be watched
+                    if level > backtrack_level:
+                        backtrack_level = level
+                        learned_clause[1], learned_clause[-1] = learned_clause[-1], learned_clause[1]
+                    if var_reason[var] is None:
+                        reasons.append(var)
+                    else:
+                        reasons += [reason_lit - num_vars if reason_lit > num_vars else reason_lit
+                                    for reason_lit in self.reason_clause(var)]
 
-            is_nice, prev_assigned_node = self.is_valid_clause(
-                conflict_clause, conflict_level)
-
-            if is_nice:
+            # the next seen variable on the trail
+            while True:
+                lit = trail[index]
+                resolved_var = lit - num_vars if lit > num_vars else lit
+                index -= 1
+                if seen[resolved_var]:
+                    break
+            seen[resolved_var] = False
+            path_count -= 1
+            if path_count == 0:
                 break
-
-            clause = self.sentence[prev_assigned_node.clause]
-            var = prev_assigned_node.var
-            conflict_side.append(var)
-            conflict_clause = self.binary_resolute(conflict_clause, clause, var)
-
-
-        if len(conflict_clause) > 1:
+            conflict_side.append(resolved_var)
+            clause = self.reason_clause(resolved_var)
+            clause_id = var_reason[resolved_var]
+
+        # the UIP literal is False, the learned clause holds its negation
+        uip_literal = lit - num_vars if lit > num_vars else lit + num_vars
+        learned_clause[0] = uip_literal
+        if var_reason[resolved_var] is None:
+            reasons.append(resolved_var)
+        else:
+            reasons += [reason_lit - num_vars if reason_lit > num_vars else reason_lit
+                        for reason_lit in self.reason_clause(resolved_var)]
+
+        self.stats._learned_literals_before += len(learned_clause)
+        derived_clause = learned_clause
+        if self._minimize == "True":
+            learned_clause = self.minimize_learned_clause(learned_clause)
+        if self._bin_minimize == "True":
+            learned_clause = self.binary_minimize_learned_clause(learned_clause)
+        if len(learned_clause) < len(derived_clause):
+            self.stats._minimized_literals += len(derived_clause) - len(learned_clause)
+            backtrack_level = self.place_backtrack_literal(learned_clause)
+        self.stats._learned_literals_after += len(learned_clause)
+
+        lbd = self.compute_lbd(learned_clause)
+        self._restarter.incre_conflict(lbd, self._trail_size)
+        if self._exchange is not None:
+            self._exchange.export(learned_clause, lbd)
+
+        for lit in derived_clause[1:]:
+            seen[lit - num_vars if lit > num_vars else lit] = False
+
+        if len(learned_clause) > 1:
             self.stats._num_learned_clauses += 1
-            clause_id = self.clause_ptr
 
-            self.sentence[self.clause_ptr] = conflict_clause
-            self.clause_ptr += 1
+            # watch the UIP literal (position 0) and the literal of the backtrack level (position 1)
+            clause_id = self.sentence.add(learned_clause, LEARNED)
+            learned_db.add(clause_id, lbd)
+            if len(learned_clause) == 2:
+                self.bin_watch[learned_clause[0]].append(learned_clause[1])
+                self.bin_watch[learned_clause[1]].append(learned_clause[0])
+                # binary reason: the other literal of the clause
+                clause_id = -learned_clause[1]
+            else:
+                self.l2c_watch[learned_clause[0]] += (clause_id, learned_clause[1])
+                self.l2c_watch[learned_clause[1]] += (clause_id, learned_clause[0])
 
-            self.l2c_watch.setdefault(conflict_clause[0],
-                                                []).append(clause_id)
-            self.l2c_watch.setdefault(conflict_clause[1],
-                                                []).append(clause_id)
+            self.sat_decider.conflict_update(learned_clause, resolved_var, conflict_side, reasons)
 
-            self.c2l_watch[clause_id] = [
-                conflict_clause[0], conflict_clause[1]
-            ]
+            # the UIP literal is implied after backtracking
+            return backtrack_level, uip_literal, clause_id
+        else:
+            # Backtrack to level 0, the literal is implied by no clause (added to level 0)
+            return 0, uip_literal, None
+
+    def compute_lbd(self, clause):
+        ''' The LBD of a clause: the number of distinct decision levels of its (assigned) literals '''
+        num_vars = self._num_vars
+        var_level = self._var_level
+        return len({var_level[lit - num_vars if lit > num_vars else lit] for lit in clause})
+
+    def is_locked(self, clause_id):
+        ''' True if the clause is the reason of a current assignment '''
+        # the implied literal of a reason clause is at its position 0
+        lit = self.sentence.lits[self.sentence.offsets[clause_id]]
+        var = lit - self._num_vars if lit > self._num_vars else lit
+        return self._values[lit] == 1 and self._var_reason[var] == clause_id
+
+    def reduce_db(self):
+        '''
+        Delete the less useful learned clauses chosen by the learned clause database (see `LearnedClauseDB`).
+        The clauses which are the reason of a current assignment are kept. With the subsume flag the learned
+        clauses are then subsumed and strengthened by each other (see `Subsumer`). The deleted clauses are dropped
+        from the watch lists, and the arena is compacted when half of its literals belong to deleted clauses.
+        '''
+        sentence = self.sentence
 
-            backtrack_level, conflict_level_literal = self.get_backtrack_level(
-                conflict_clause, conflict_level)
+        to_delete = self._learned_db.select_for_deletion(self.is_locked)
+        for clause_id in to_delete:
+            sentence.delete(clause_id)
 
-            conflict_level_var = self.get_var_from_literal(conflict_level_literal)
+        if self._subsume == "True":
+            Subsumer(self, learned=True).run()
 
-            is_negative_conflict_lit = self.is_negative_literal(
-                conflict_level_literal)
+        self.purge_watches()
 
-            
-            reasons = []
-            for lit in conflict_clause:
-                var = self.get_var_from_literal(lit)
-                if var in self.v2a_watch:
-                    node = self.v2a_watch[var]
-                    if node.clause is None:
-                        reasons += [var]
-                    else:
-                        reason_clause = self.sentence[node.clause]
-                        reasons += [self.get_var_from_literal(lit) for lit in reason_clause]
-            self.sat_decider.conflict_update(conflict_clause, conflict_level_var, conflict_side, reasons)
+        self.stats._db_reductions += 1
+        self.stats._deleted_clauses += len(to_delete)
+        self.stats._live_clauses_history.append((self._learned_db.conflicts, sentence.num_live()))
 
-            value_to_set = True
-            if is_negative_conflict_lit:
-                value_to_set = False
+    def import_clauses(self):
+        '''
+        Add the clauses received from the other workers of a portfolio (see `ClauseExchange`), at level 0.
+        They are implied by the original formula, but a clause over a variable eliminated or substituted
+        here is skipped. The satisfied clauses are skipped too and the False literals removed, a unit is
+        assigned and propagated by the next `bcp()`, and an empty clause makes the formula UNSAT.
+        '''
+        received = self._exchange.receive()
+        if not received:
+            return
+        num_vars = self._num_vars
+        values = self._values
+        eliminated = set(self._eliminated_vars)
+        for clause, lbd in received:
+            if any((lit - num_vars if lit > num_vars else lit) in eliminated for lit in clause):
+                continue
+            new_clause = []
+            for lit in clause:
+                value = values[lit]
+                if value == 1:
+                    break
+                if value == -1:
+                    new_clause.append(lit)
+            else:
+                if not new_clause:
+                    self.stats._result = "UNSAT"
+                    return
+                self.stats._share_imported += 1
+                if len(new_clause) == 1:
+                    lit = new_clause[0]
+                    self.add_unit(lit)
+                    self.sat_decider.unary_update(lit - num_vars if lit > num_vars else lit)
+                    continue
+                clause_id = self.sentence.add(new_clause, LEARNED)
+                self._learned_db.add(clause_id, min(lbd, len(new_clause)))
+                self.attach_clause(clause_id)
+                self._imported.add(clause_id)
+
+    def simplify_due(self):
+        '''
+        A simplification is due if variables were assigned at level 0 since the last one, and there were
+        at least as many implications as literals in the clauses since then (it costs a pass over them)
+        '''
+        return self._trail_size > self._simplify_assigns and self.stats._num_implications >= self._simplify_props
 
-            node = AssignedNode(conflict_level_var, value_to_set, backtrack_level,
-                                clause_id)
+    def simplify(self):
+        '''
+        Simplify the clauses with the level 0 assignments, once they are all propagated: the satisfied clauses,
+        original and learned, are deleted and the False literals are removed from the other ones.
+        The watched literals of a clause which is not satisfied are not False, they are kept at the positions
+        0 and 1 and only the clauses which become binary move to the binary implication lists. The blockers of
+        the watches of the other shortened clauses may be removed literals, they are replaced by the other
+        watched literal.
+        The binary implications are propagated first, so a moved clause changes the order of the propagations,
+        which makes the search differ from the one without simplification.
+        '''
+        num_vars = self._num_vars
+        values = self._values
+        sentence = self.sentence
+        lits = sentence.lits
+        offsets = sentence.offsets
+        sizes = sentence.sizes
+        learned_db = self._learned_db
+        removed_clauses = 0
+        removed_literals = 0
+        shortened = set()
+        for clause_id in list(sentence.ids()):
+            offset = offsets[clause_id]
+            size = sizes[clause_id]
+            satisfied = False
+            num_false = 0
+            for lit in lits[offset:offset + size]:
+                value = values[lit]
+                if value == 1:
+                    satisfied = True
+                    break
+                if value == 0:
+                    num_false += 1
+            if satisfied:
+                sentence.delete(clause_id)
+                if sentence.is_learned(clause_id):
+                    learned_db.remove(clause_id)
+                removed_clauses += 1
+            elif num_false > 0:
+                new_clause = [lit for lit in lits[offset:offset + size] if values[lit] == -1]
+                removed_literals += num_false
+                if sentence.is_learned(clause_id):
+                    learned_db.shorten(clause_id, len(new_clause))
+                if len(new_clause) == 2:
+                    self.detach_clause(clause_id)
+                    sentence.replace(clause_id, new_clause)
+                    self.attach_clause(clause_id)
+                else:
+                    sentence.replace(clause_id, new_clause)
+                    shortened.add(clause_id)
+
+        if shortened:
+            for lit, watch_list in enumerate(self.l2c_watch):
+                for i in range(0, len(watch_list), 2):
+                    clause_id = watch_list[i]
+                    if clause_id in shortened:
+                        offset = offsets[clause_id]
+                        other = lits[offset + 1] if lits[offset] == lit else lits[offset]
+                        watch_list[i + 1] = other
+
+        # the binary clauses with an assigned literal are satisfied
+        bin_watch = self.bin_watch
+        for lit in self._trail[:self._trail_size]:
+            bin_watch[lit] = []
+            bin_watch[lit - num_vars if lit > num_vars else lit + num_vars] = []
+            # the deleted clauses may be reasons of level 0 assignments, which are never read
+            self._var_reason[lit - num_vars if lit > num_vars else lit] = None
+        for lit in range(1, 2 * num_vars + 1):
+            implied = bin_watch[lit]
+            if implied and values[lit] == -1:
+                bin_watch[lit] = [implied_lit for implied_lit in implied if values[implied_lit] != 1]
+        self.purge_watches()
+
+        self._simplify_assigns = self._trail_size
+        self._simplify_props = self.stats._num_implications + len(lits) - sentence.wasted
+        self.stats._simplify_calls += 1
+        self.stats._simplify_clauses += removed_clauses
+        self.stats._simplify_literals += removed_literals
+        self.stats._simplify_history.append((removed_clauses, removed_literals))
+
+    def purge_watches(self):
+        ''' Drop the deleted clauses from the watch lists, and compact the arena if half of it is wasted '''
+        sentence = self.sentence
+        flags = sentence.flags
+        for watch_list in self.l2c_watch:
+            j = 0
+            for i in range(0, len(watch_list), 2):
+                if not flags[watch_list[i]] & DELETED:
+                    watch_list[j] = watch_list[i]
+                    watch_list[j + 1] = watch_list[i + 1]
+                    j += 2
+            del watch_list[j:]
+
+        if sentence.wasted * 2 > len(sentence.lits):
+            sentence.compact()
+
+    def detach_clause(self, clause_id):
+        ''' Remove the clause (of at least 2 literals) from the watch lists of its literals at the positions 0 and 1 '''
+        sentence = self.sentence
+        offset = sentence.offsets[clause_id]
+        lit1 = sentence.lits[offset]
+        lit2 = sentence.lits[offset + 1]
+        if sentence.sizes[clause_id] == 2:
+            self.bin_watch[lit1].remove(lit2)
+            self.bin_watch[lit2].remove(lit1)
+            return
+        for lit in (lit1, lit2):
+            watch_list = self.l2c_watch[lit]
+            for i in range(0, len(watch_list), 2):
+                if watch_list[i] == clause_id:
+                    del watch_list[i:i + 2]
+                    break
 
-            return backtrack_level, node
+    def attach_clause(self, clause_id):
+        ''' Watch the literals at the positions 0 and 1 of the clause (of at least 2 literals) '''
+        sentence = self.sentence
+        offset = sentence.offsets[clause_id]
+        lit1 = sentence.lits[offset]
+        lit2 = sentence.lits[offset + 1]
+        if sentence.sizes[clause_id] == 2:
+            self.bin_watch[lit1].append(lit2)
+            self.bin_watch[lit2].append(lit1)
         else:
-            literal = conflict_clause[0]
-            var = self.get_var_from_literal(literal)
-            is_negative_literal = self.is_negative_literal(literal)
-
-            # Backtrack to level 0
-            backtrack_level = 0
-
-            # If conflict_level_literal is negative, its variable should be set False,
-            # else it should be set True
-            value_to_set = True
-            if is_negative_literal:
-                value_to_set = False
+            self.l2c_watch[lit1] += (clause_id, lit2)
+            self.l2c_watch[lit2] += (clause_id, lit1)
 
-            # Create the node with var, value_to_set,backtrack_level(0)
-            # Clause is set to None as this is implied by no clause
-            # (added to level 0)
-            node = AssignedNode(var, value_to_set, backtrack_level, None)
-
-            # return the backtrack level and the assignment node
-            return backtrack_level, node
-
-    def backtrack(self, backtrack_level, node_to_add, restart_flag=False):
+    def minimize_learned_clause(self, learned_clause):
+        '''
+        Recursive minimization of a learned clause (the literals of learned_clause[1:] are marked as seen).
+        A literal is removed if its reason clause only holds literals which are in the learned clause,
+        assigned at level 0, or themselves removable in the same way.
+        *Used in `analyze_conflict()`.
+        '''
+        num_vars = self._num_vars
+        var_level = self._var_level
+        var_reason = self._var_reason
+        # a cheap filter: a removable literal can only depend on the levels of the clause
+        abstract_levels = 0
+        for lit in learned_clause[1:]:
+            abstract_levels |= 1 << (var_level[lit - num_vars if lit > num_vars else lit] & 31)
+
+        # the variables marked while checking the literals, cleared at the end
+        marked = []
+        minimized_clause = [learned_clause[0]]
+        for lit in learned_clause[1:]:
+            var = lit - num_vars if lit > num_vars else lit
+            if var_reason[var] is None or not self.is_redundant_literal(var, abstract_levels, marked):
+                minimized_clause.append(lit)
+
+        for var in marked:
+            self._seen[var] = False
+        return minimized_clause
+
+    def is_redundant_literal(self, var, abstract_levels, marked):
+        '''
+        Check (with an explicit stack) whether the implied variable var is implied by the seen variables.
+        The variables found redundant on the way are marked as seen and added to marked.
+        '''
+        num_vars = self._num_vars
+        seen = self._seen
+        var_level = self._var_level
+        var_reason = self._var_reason
+        top = len(marked)
+        stack = [var]
+        while stack:
+            implied_var = stack.pop()
+            for lit in self.reason_clause(implied_var):
+                reason_var = lit - num_vars if lit > num_vars else lit
+                if reason_var == implied_var or seen[reason_var] or var_level[reason_var] == 0:
+                    continue
+                if var_reason[reason_var] is not None and (1 << (var_level[reason_var] & 31)) & abstract_levels:
+                    seen[reason_var] = True
+                    stack.append(reason_var)
+                    marked.append(reason_var)
+                else:
+                    # not redundant, undo the marks of this check
+                    for marked_var in marked[top:]:
+                        seen[marked_var] = False
+                    del marked[top:]
+                    return False
+        return True
+
+    def binary_minimize_learned_clause(self, learned_clause):
+        '''
+        Cheap strengthening with the binary implication lists: if the binary clause (uip, lit) exists
+        with lit True and its negation in the learned clause, resolving both removes the negation.
+        *Used in `analyze_conflict()`.
+        '''
+        num_vars = self._num_vars
+        values = self._values
+        removable = set()
+        for lit in self.bin_watch[learned_clause[0]]:
+            if values[lit] == 1:
+                removable.add(lit - num_vars if lit > num_vars else lit + num_vars)
+        if not removable:
+            return learned_clause
+        return [learned_clause[0]] + [lit for lit in learned_clause[1:] if lit not in removable]
+
+    def place_backtrack_literal(self, learned_clause):
+        '''
+        Move a literal of the highest level of learned_clause[1:] to position 1, returns that level
+        '''
+        num_vars = self._num_vars
+        backtrack_level = 0
+        for k in range(1, len(learned_clause)):
+            lit = learned_clause[k]
+            level = self._var_level[lit - num_vars if lit > num_vars else lit]
+            if level > backtrack_level:
+                backtrack_level = level
+                learned_clause[1], learned_clause[k] = learned_clause[k], learned_clause[1]
+        return backtrack_level
+
+    def backtrack(self, backtrack_level, literal_to_add=None, reason=None):
         '''
         Method used to backtrack the solver to the backtrack_level.
-        It also adds the node_to_add to the assignment stack.
+        The trail is truncated in bulk at the trail limit of the level.
+        It also assigns literal_to_add after backtracking.
 
         Parameters:
             backtrack_level: the level to which the solver should backtrack(backjump)
-            node_to_add: the implication node implied by the conflict clause to be added
-            to the assignment stack at time of backtrack
+            literal_to_add: the literal implied by the conflict clause, set at the backtrack level
+            reason: the reason of literal_to_add (see `init_assignment()`), None if it is a unit
 
         Return:
             None
         '''
-        self._level = backtrack_level
-
-        itr = len(self._assignment) - 1
+        num_vars = self._num_vars
         var_list = []
-        while True:
-            if itr < 0:
-
-                break
-            if self._assignment[itr].level <= backtrack_level:
-                break
-            else:
-                del self.v2a_watch[
-                    self._assignment[itr].var]
-
-                node = self._assignment.pop(itr)
-                var_list.append(node.var)
-                del node
-
-                # move to the next node
-                itr -= 1
+        if backtrack_level < self._level:
+            values = self._values
+            start = self._trail_lim[backtrack_level]
+            for lit in self._trail[start:self._trail_size]:
+                values[lit] = -1
+                if lit > num_vars:
+                    var = lit - num_vars
+                    values[var] = -1
+                else:
+                    var = lit
+                    values[var + num_vars] = -1
+                var_list.append(var)
+            self._trail_size = start
+            self._qhead = start
+            self._bin_qhead = start
+            del self._trail_lim[backtrack_level:]
 
+        self._level = backtrack_level
         
-        self.sat_decider.backtrack_update(var_list,restart_flag)
+        self.sat_decider.backtrack_update(var_list)
 
-        if node_to_add:
-            self.v2a_watch[node_to_add.var] = node_to_add
-
-            self._assignment.append(node_to_add)
-            node_to_add.index = len(self._assignment) - 1
+        if literal_to_add is not None:
+            self.assign(literal_to_add, reason)
             
-            self.sat_decider.bcp_update(node_to_add.var, node_to_add.value)
+            self.sat_decider.bcp_update(self.get_var_from_literal(literal_to_add), literal_to_add <= num_vars)
             self.stats._num_implications += 1
 
     """ SOLVE THE SAT PROBLEM! """
@@ -546,25 +956,35 @@ class SAT:
 
         self.read_cnf_file(cnf_filename)
 
-        self.sat_decider = Decider(self._decider, self.sentence.values(), self._num_vars)
-        for node in self._assignment:
-            self.sat_decider.unary_update(node.var)
+        self.sat_decider = Decider(self._decider, self.sentence, self._num_vars, self._vsids_decay, self._seed)
+        for lit in self._trail[:self._trail_size]:
+            self.sat_decider.unary_update(self.get_var_from_literal(lit))
+        # the eliminated variables are never decided, they are assigned by the reconstruction
+        for var in self._eliminated_vars:
+            self.sat_decider.unary_update(var)
+
+        if self._probe == "True" and self.stats._result != "UNSAT":
+            self.stats._probe_flag = True
+            Prober(self).run()
+        if self._inprocess == "True":
+            self._inprocessor = Inprocessor(self)
+        if self._simplify == "True":
+            self.stats._simplify_flag = True
 
         self.stats._read_time = time.time()
 
         self.stats._num_vars = self._num_vars
-        self.stats._num_clauses = self.clause_ptr
+        self.stats._num_clauses = self.sentence.num_live()
 
         if self.stats._result == "UNSAT":
             # The case where implications from the unary clauses cause a conflict
             self.stats._complete_time = time.time()
         else:
             # solve the SAT problem
-            first_time = True
             while True:
                 while True:
                     temp = time.time()
-                    result, propagated = self.bcp(first_time)
+                    result, propagated = self.bcp()
 
                     self.sat_decider.chb_update(propagated, result == "CONFLICT")
 
@@ -572,16 +992,8 @@ class SAT:
                     if result == "NO_CONFLICT":
                         break
 
-                    if result == "RESTART":
-                        new_heuristic = self._restarter.choose()
-                        self.backtrack(0, None, True)
-                        self.sat_decider.change_heuristic(new_heuristic)
-                        break
-
-                    first_time = False
-
                     temp = time.time()
-                    backtrack_level, node_to_add = self.analyze_conflict()
+                    backtrack_level, literal_to_add, reason = self.analyze_conflict()
 
                     self.stats._analyze_time += time.time() - temp
 
@@ -592,14 +1004,54 @@ class SAT:
                         break
 
                     temp = time.time()
-                    self.backtrack(backtrack_level, node_to_add)
+                    self.backtrack(backtrack_level, literal_to_add, reason)
 
                     self.stats._backtrack_time += time.time() - temp
 
-                if self.stats._result == "UNSAT":
+                    if self._learned_db.reduce_due():
+                        temp = time.time()
+                        self.reduce_db()
+                        self.stats._reduce_time += time.time() - temp
+
+                    # restart after the learned clause is added, the pending literals at level 0
+                    # are propagated by the next bcp()
+                    if self._level > 0 and self._restarter.get_restart_flag():
+                        self.stats._restarts += 1
+                        new_heuristic = self._restarter.choose()
+                        # switch first, the variables unassigned by the restart go to the new queue
+                        temp = time.time()
+                        self.sat_decider.change_heuristic(new_heuristic)
+                        self.stats._switch_time += time.time() - temp
+                        self.backtrack(0)
+
+                    # a portfolio worker stops once another worker has found the answer
+                    if self._stop is not None and self._learned_db.conflicts % STOP_CHECK_INTERVAL == 0 \
+                            and self._stop.is_set():
+                        self.stats._result = "UNKNOWN"
+                        self.stats._complete_time = time.time()
+                        break
+
+                    # import the clauses of the other portfolio workers at level 0
+                    if self._exchange is not None and self._level == 0:
+                        self.import_clauses()
+                        if self.stats._result == "UNSAT":
+                            self.stats._complete_time = time.time()
+                            break
+
+                    # simplify the formula at level 0, after a restart or a learned unit
+                    if self._inprocessor is not None and self._level == 0 and self._inprocessor.due():
+                        self._inprocessor.run()
+                        if self.stats._result == "UNSAT":
+                            self.stats._complete_time = time.time()
+                            break
+
+                if self.stats._result in ("UNSAT", "UNKNOWN"):
                     break
 
-                first_time = False
+                if self._simplify == "True" and self._level == 0 and self.simplify_due():
+                    temp = time.time()
+                    self.simplify()
+                    self.stats._simplify_time += time.time() - temp
 
                 temp = time.time()
                 var_decided = self.decide()
@@ -616,36 +1068,21 @@ class SAT:
 
                     break
 
-        # store the result as files  
-        if not os.path.isdir("Results"):
-            os.mkdir("Results")
-
-        inputfile_basename = os.path.basename(cnf_filename)
+        if self._restarter.restarter == "GLUCOSE":
+            self.stats._blocked_restarts = self._restarter.blocked_restarts
 
-        # Extracts test case name from the base file name
-        # eg. bmc-1 from bmc-1.cnf
-        input_case_name = os.path.splitext(inputfile_basename)[0]
-
-        # Create the filename for stats file
-        # eg. Results/stats_bmc-1.txt
-        stats_file_name = "Results/stats_" + input_case_name + ".txt"
-
-        self.stats._output_statistics_file = stats_file_name
-
-        original_stdout = sys.stdout
-        sys.stdout = open(stats_file_name, "wt")
-        self.stats.print_stats()
-        sys.stdout = original_stdout
+        live_clauses = self.sentence.num_live()
+        if live_clauses > 0:
+            self.stats._bytes_per_clause = self.sentence.memory_bytes() / live_clauses
 
         if self.stats._result == "SAT":
-            assgn_file_name = "Results/assgn_" + input_case_name + ".txt"
-            self.stats._output_assignment_file = assgn_file_name
-
+            # extend the model to the eliminated variables
+            self._reconstruction.extend(self._values)
             self.assignment_dict = {}
-            for var in self.v2a_watch:
-                self.assignment_dict[var] = self.v2a_watch[var].value
+            for var in range(1, self._num_vars + 1):
+                if self._values[var] != -1:
+                    self.assignment_dict[var] = self._values[var] == 1
 
-            # the assignment file
-            assgn_file = open(assgn_file_name, "w")
-            assgn_file.write(json.dumps(self.assignment_dict))
-            assgn_file.close
+        # the workers of a portfolio leave the result files to the portfolio
+        if self._stop is None:
+            write_results(cnf_filename, self.stats, self.assignment_dict)
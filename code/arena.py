@@ -0,0 +1,135 @@
+import sys
+from array import array
+
+# bits of the per-clause flag word
+LEARNED = 1
+DELETED = 2
+
+
+class ClauseArena:
+    """
+    Contiguous storage of all the clauses of a formula.
+
+    The literals of every clause are kept back to back in one growable int array,
+    and each clause is described by an offset, a length and a flag word stored in
+    parallel arrays indexed by the clause id. Clause ids are never reused, a deleted
+    clause only gets the DELETED flag.
+
+    Attributes:
+        lits: the literals of all the clauses
+        offsets: offsets[cid] is the position of the first literal of clause cid in lits
+        sizes: sizes[cid] is the number of literals of clause cid
+        flags: flags[cid] holds the LEARNED and DELETED bits of clause cid
+        num_deleted: number of clauses with the DELETED flag
+        wasted: number of literals of deleted clauses still held in lits, see `compact()`
+    """
+
+    def __init__(self):
+        self.lits = array('i')
+        self.offsets = array('i')
+        self.sizes = array('i')
+        self.flags = array('i')
+        self.num_deleted = 0
+        self.wasted = 0
+
+    def __len__(self):
+        ''' Number of clause ids, deleted clauses included '''
+        return len(self.offsets)
+
+    def __iter__(self):
+        ''' Iterate over the live clauses, as lists of literals '''
+        for cid in self.ids():
+            yield self.clause(cid)
+
+    def add(self, clause, flags=0):
+        ''' Append a clause (sequence of literals) and return its id '''
+        cid = len(self.offsets)
+        self.offsets.append(len(self.lits))
+        self.sizes.append(len(clause))
+        self.flags.append(flags)
+        self.lits.extend(clause)
+        return cid
+
+    def clause(self, cid):
+        ''' Return the clause cid as a list of literals '''
+        offset = self.offsets[cid]
+        return self.lits[offset:offset + self.sizes[cid]].tolist()
+
+    def delete(self, cid):
+        if not self.flags[cid] & DELETED:
+            self.flags[cid] |= DELETED
+            self.num_deleted += 1
+            self.wasted += self.sizes[cid]
+
+    def remove_literal(self, cid, lit):
+        ''' Remove lit from the clause cid in place, the order of the other literals is kept '''
+        offset = self.offsets[cid]
+        end = offset + self.sizes[cid]
+        lits = self.lits
+        k = lits.index(lit, offset, end)
+        lits[k:end - 1] = lits[k + 1:end]
+        lits[end - 1] = 0
+        self.sizes[cid] -= 1
+        self.wasted += 1
+
+    def replace(self, cid, clause):
+        ''' Overwrite the clause cid in place with clause, which must not be longer '''
+        offset = self.offsets[cid]
+        size = self.sizes[cid]
+        self.lits[offset:offset + len(clause)] = array('i', clause)
+        self.sizes[cid] = len(clause)
+        self.wasted += size - len(clause)
+
+    def is_deleted(self, cid):
+        return self.flags[cid] & DELETED != 0
+
+    def is_learned(self, cid):
+        return self.flags[cid] & LEARNED != 0
+
+    def ids(self):
+        ''' Iterate over the ids of the live clauses '''
+        flags = self.flags
+        for cid in range(len(self.offsets)):
+            if not flags[cid] & DELETED:
+                yield cid
+
+    def num_live(self):
+        return len(self.offsets) - self.num_deleted
+
+    def copy(self):
+        arena = ClauseArena()
+        arena.lits = array('i', self.lits)
+        arena.offsets = array('i', self.offsets)
+        arena.sizes = array('i', self.sizes)
+        arena.flags = array('i', self.flags)
+        arena.num_deleted = self.num_deleted
+        arena.wasted = self.wasted
+        return arena
+
+    def compact(self):
+        '''
+        Drop the literals of the deleted clauses from lits, moving the live clauses down.
+        The clause ids are kept, the deleted clauses get an empty range.
+        '''
+        lits = self.lits
+        offsets = self.offsets
+        sizes = self.sizes
+        flags = self.flags
+        end = 0
+        for cid in range(len(offsets)):
+            if flags[cid] & DELETED:
+                offsets[cid] = end
+                sizes[cid] = 0
+                continue
+            offset = offsets[cid]
+            size = sizes[cid]
+            if offset != end:
+                lits[end:end + size] = lits[offset:offset + size]
+                offsets[cid] = end
+            end += size
+        del lits[end:]
+        self.wasted = 0
+
+    def memory_bytes(self):
+        ''' Bytes allocated by the arena (array headers included) '''
+        return sum(sys.getsizeof(a) for a in (self.lits, self.offsets, self.sizes, self.flags))
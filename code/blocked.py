@@ -0,0 +1,144 @@
+import time
+from utils import PriorityQueue
+
+# clauses are not checked on a literal whose negation has more occurrences
+BCE_OCCURRENCE_LIMIT = 100
+# the pass stops after so many ticks per literal of the formula
+BCE_EFFORT = 10
+
+
+class BlockedClauseEliminator:
+    """
+    Blocked clause elimination on the clauses of a `SAT` solver, run before the search.
+
+    A clause C is blocked on its literal l if every resolvent of C on l, with the clauses holding -l,
+    is a tautology. Removing C keeps the formula satisfiable: a model of the formula without C which
+    falsifies C is repaired by flipping l, so C is pushed on the reconstruction stack of the solver
+    with the witness l.
+
+    The occurrence lists of the literals are kept up to date while clauses are removed, and the
+    candidate literals are taken from a heap ordered by the number of occurrences of their negation,
+    the cheapest first. Removing a clause C can only make blocked the clauses holding the negation of
+    a literal of C, so these negations are rescheduled. Literals assigned at level 0 are ignored and
+    clauses satisfied at level 0 are skipped, `SAT.simplify()` removes them.
+
+    The effort is counted in ticks, the literals of the clauses holding -l scanned by the checks,
+    and the pass stops when budget ticks are spent (BCE_EFFORT ticks per literal if None).
+
+    Attributes:
+        occurs: occurs[lit] is the set of the ids of the clauses holding lit
+        removed: number of clauses removed
+        ticks: the effort spent
+    """
+
+    def __init__(self, solver, occurrence_limit=BCE_OCCURRENCE_LIMIT, budget=None):
+        self.solver = solver
+        self.sentence = solver.sentence
+        self.num_vars = solver._num_vars
+        self.values = solver._values
+        self.occurrence_limit = occurrence_limit
+        self.budget = budget
+        self.ticks = 0
+        self.removed = 0
+
+        self.occurs = [set() for _ in range(2 * self.num_vars + 1)]
+        # marks[lit] == stamp while lit is in the clause being checked
+        self.marks = [0] * (2 * self.num_vars + 1)
+        self.stamp = 0
+        self.queue = None
+
+    def negate(self, lit):
+        return lit - self.num_vars if lit > self.num_vars else lit + self.num_vars
+
+    def cost(self, lit):
+        ''' Cost of the checks on lit, None if it is not a candidate '''
+        num_neg = len(self.occurs[self.negate(lit)])
+        if self.values[lit] != -1 or not self.occurs[lit] or num_neg > self.occurrence_limit:
+            return None
+        return num_neg
+
+    def run(self):
+        ''' Remove the blocked clauses, returns the number of clauses removed '''
+        start_time = time.time()
+        sentence = self.sentence
+        values = self.values
+        num_lits = 0
+        for clause_id in sentence.ids():
+            clause = sentence.clause(clause_id)
+            if any(values[lit] == 1 for lit in clause):
+                continue
+            num_lits += len(clause)
+            for lit in clause:
+                self.occurs[lit].add(clause_id)
+        if self.budget is None:
+            self.budget = BCE_EFFORT * num_lits
+
+        scores = [0] * (2 * self.num_vars + 1)
+        candidates = []
+        for lit in range(1, 2 * self.num_vars + 1):
+            cost = self.cost(lit)
+            if cost is not None:
+                scores[lit] = -cost
+                candidates.append(lit)
+        # the cheapest literal on the top
+        self.queue = PriorityQueue(scores, candidates)
+
+        while self.ticks <= self.budget:
+            lit = self.queue.get_top()
+            if lit == -1:
+                break
+            if self.cost(lit) is None:
+                continue
+            for clause_id in list(self.occurs[lit]):
+                if self.is_blocked(clause_id, lit):
+                    self.remove_clause(clause_id, lit)
+
+        stats = self.solver.stats
+        stats._bce_clauses += self.removed
+        stats._bce_ticks += self.ticks
+        stats._bce_time += time.time() - start_time
+        return self.removed
+
+    def is_blocked(self, clause_id, lit):
+        ''' True if every resolvent of the clause clause_id on lit is a tautology '''
+        sentence = self.sentence
+        values = self.values
+        marks = self.marks
+        num_vars = self.num_vars
+        self.stamp += 1
+        stamp = self.stamp
+        for other_lit in sentence.clause(clause_id):
+            if values[other_lit] == -1:
+                marks[other_lit] = stamp
+
+        lits = sentence.lits
+        offsets = sentence.offsets
+        sizes = sentence.sizes
+        negated_lit = self.negate(lit)
+        for other_id in self.occurs[negated_lit]:
+            offset = offsets[other_id]
+            size = sizes[other_id]
+            self.ticks += size
+            for other_lit in lits[offset:offset + size]:
+                if other_lit != negated_lit and \
+                        marks[other_lit - num_vars if other_lit > num_vars else other_lit + num_vars] == stamp:
+                    break
+            else:
+                # a resolvent which is not a tautology
+                return False
+        return True
+
+    def remove_clause(self, clause_id, witness):
+        sentence = self.sentence
+        clause = sentence.clause(clause_id)
+        self.solver._reconstruction.push(witness, clause)
+        sentence.delete(clause_id)
+        self.removed += 1
+        queue = self.queue
+        for lit in clause:
+            self.occurs[lit].discard(clause_id)
+            # the clauses holding the negation of lit may now be blocked
+            negated_lit = self.negate(lit)
+            cost = self.cost(negated_lit)
+            if cost is not None:
+                queue.add(negated_lit, -cost)
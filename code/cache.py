@@ -0,0 +1,142 @@
+import os
+import mmap
+import struct
+import hashlib
+from array import array
+
+# Default location and size bound of the cache directory
+DEFAULT_CACHE_DIR = ".cnf_cache"
+DEFAULT_CACHE_SIZE = 1024 * 2**20
+
+# magic, byte order mark, num_vars, num_orig_clauses, num_clauses, num_literals, num_units, unsat flag
+_HEADER = struct.Struct("=8siiiiiii")
+_MAGIC = b"CNFCACHE"
+_BYTE_ORDER_MARK = 0x01020304
+_SUFFIX = ".bin"
+
+
+class CachedFormula:
+    """
+    A parsed formula loaded from the cache. The arrays are int32 memoryviews over the
+    memory mapped cache file, so nothing is copied until the solver reads them.
+
+    Attributes:
+        num_vars: number of variables of the formula
+        num_orig_clauses: number of clauses given in the `p cnf` header
+        num_clauses: number of stored (non unit) clauses
+        literals: flat array of literals (in the solver's encoding)
+        offsets: array of size num_clauses + 1, clause i is literals[offsets[i]:offsets[i+1]]
+        units: the literals assigned at level 0 by the unit clauses
+        unsat: True if the formula was found UNSAT while reading it
+    """
+
+    def __init__(self, cache_file, header):
+        _, _, self.num_vars, self.num_orig_clauses, self.num_clauses, num_literals, num_units, unsat = header
+        self.unsat = bool(unsat)
+        self._map = mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ)
+        ints = memoryview(self._map)[_HEADER.size:].cast("i")
+        self.literals = ints[:num_literals]
+        self.offsets = ints[num_literals:num_literals + self.num_clauses + 1]
+        self.units = ints[num_literals + self.num_clauses + 1:num_literals + self.num_clauses + 1 + num_units]
+
+    def clause(self, i):
+        ''' Return the i-th clause as a list of literals '''
+        return self.literals[self.offsets[i]:self.offsets[i + 1]].tolist()
+
+
+class FormulaCache:
+    """
+    On-disk cache of parsed formulas, keyed by a hash of the .cnf file content.
+
+    Each entry is a binary file holding a flat int32 literal array, the clause offsets
+    and the level-0 units, which is memory mapped when loaded. The directory is bounded
+    in size, the least recently used entries are evicted first.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_SIZE):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def key(self, cnf_filename):
+        ''' The key of a file is the hash of its (raw) content '''
+        digest = hashlib.blake2b(digest_size=20)
+        with open(cnf_filename, "rb") as cnf_file:
+            while True:
+                chunk = cnf_file.read(1 << 20)
+                if not chunk:
+                    break
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + _SUFFIX)
+
+    def load(self, key):
+        '''
+        Return the CachedFormula stored under key, or None on a cache miss.
+        '''
+        path = self._path(key)
+        try:
+            cache_file = open(path, "rb")
+        except OSError:
+            return None
+        with cache_file:
+            header = _HEADER.unpack(cache_file.read(_HEADER.size))
+            if header[0] != _MAGIC or header[1] != _BYTE_ORDER_MARK:
+                return None
+            formula = CachedFormula(cache_file, header)
+        # mark the entry as recently used
+        os.utime(path)
+        return formula
+
+    def store(self, key, num_vars, num_orig_clauses, clauses, units, unsat):
+        '''
+        Store a parsed formula under key and evict old entries if the cache is too large.
+
+        Parameters:
+            clauses: iterable of the stored clauses (lists of literals)
+            units: list of the literals assigned at level 0 by the unit clauses
+            unsat: True if the formula was found UNSAT while reading it
+        '''
+        literals = array("i")
+        offsets = array("i", [0])
+        for clause in clauses:
+            literals.extend(clause)
+            offsets.append(len(literals))
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path + ".tmp{}".format(os.getpid())
+        with open(tmp_path, "wb") as cache_file:
+            cache_file.write(_HEADER.pack(_MAGIC, _BYTE_ORDER_MARK, num_vars, num_orig_clauses,
+                                          len(offsets) - 1, len(literals), len(units), int(unsat)))
+            literals.tofile(cache_file)
+            offsets.tofile(cache_file)
+            array("i", units).tofile(cache_file)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def _entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(_SUFFIX):
+                st = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((st.st_mtime, st.st_size, name))
+        return entries
+
+    def evict(self):
+        ''' Remove the least recently used entries until the cache fits in max_bytes '''
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
+
+    def clear(self):
+        ''' Remove every entry of the cache '''
+        for _, _, name in self._entries():
+            os.remove(os.path.join(self.cache_dir, name))
@@ -0,0 +1,155 @@
+# tiers of the learned clauses
+CORE = 0
+MID = 1
+LOCAL = 2
+
+# a mid tier clause not used in conflict analysis for so many reductions moves to the local tier
+MID_TIER_LIFETIME = 1
+# activities are rescaled when they grow over this bound
+ACTIVITY_LIMIT = 1e20
+
+
+class LearnedClauseDB:
+    """
+    Bookkeeping of the learned clauses, used to bound the size of the clause database.
+
+    Every learned clause gets an LBD (literal block distance: the number of distinct decision
+    levels of its literals) and an activity, and is stored in one of three tiers:
+
+        core: LBD <= core_lbd, never deleted
+        mid: LBD <= mid_lbd, kept while it takes part in conflict analysis, moved to the
+             local tier when it was not used since the last reduction
+        local: the other clauses, the less active half is deleted at every reduction
+
+    The clauses used in conflict analysis get their activity bumped and their LBD updated,
+    a clause whose LBD drops under a tier bound is promoted, as is a shortened clause (see
+    `shorten()`). The deletion itself (and the
+    protection of the clauses which are reasons) is done by the solver, see `SAT.reduce_db()`.
+
+    Attributes:
+        tiers: the sets of clause ids of the core, mid and local tiers
+        lbd: the LBD of every learned clause
+        activity: the activity of every learned clause
+        conflicts: number of conflicts so far
+        next_reduce: number of conflicts at which the next reduction is due, None to never reduce
+    """
+
+    def __init__(self, reduce_interval=2000, reduce_increment=300, core_lbd=2, mid_lbd=6, decay=0.999):
+        '''
+        Parameters:
+            reduce_interval: number of conflicts before the first reduction, 0 to never reduce
+            reduce_increment: the interval between two reductions grows by so many conflicts each time
+            core_lbd, mid_lbd: the upper LBD bounds of the core and the mid tier
+            decay: the activity decay factor applied at every conflict
+        '''
+        self.tiers = (set(), set(), set())
+        self.lbd = {}
+        self.activity = {}
+        self._last_used = {}
+        self._core_lbd = core_lbd
+        self._mid_lbd = mid_lbd
+        self._activity_inc = 1.0
+        self._decay = decay
+        self.conflicts = 0
+        self.reductions = 0
+        self._reduce_interval = reduce_interval
+        self._reduce_increment = reduce_increment
+        self.next_reduce = reduce_interval if reduce_interval > 0 else None
+
+    def __len__(self):
+        return len(self.lbd)
+
+    def tier_of(self, lbd):
+        if lbd <= self._core_lbd:
+            return CORE
+        if lbd <= self._mid_lbd:
+            return MID
+        return LOCAL
+
+    def add(self, clause_id, lbd):
+        ''' Add a new learned clause, it starts with the current activity increment '''
+        self.lbd[clause_id] = lbd
+        self.activity[clause_id] = self._activity_inc
+        self._last_used[clause_id] = self.reductions
+        self.tiers[self.tier_of(lbd)].add(clause_id)
+
+    def _forget(self, clause_id):
+        for tier in self.tiers:
+            tier.discard(clause_id)
+        del self.lbd[clause_id]
+        del self.activity[clause_id]
+        del self._last_used[clause_id]
+
+    def remove(self, clause_id):
+        ''' Forget a learned clause deleted by the solver outside of a reduction (e.g. subsumed) '''
+        self._forget(clause_id)
+
+    def bump(self, clause_id, lbd):
+        '''
+        Called for a learned clause used in conflict analysis, lbd is its LBD under the current assignment.
+        '''
+        activity = self.activity[clause_id] + self._activity_inc
+        self.activity[clause_id] = activity
+        if activity > ACTIVITY_LIMIT:
+            self._rescale()
+        self._last_used[clause_id] = self.reductions
+
+        if lbd < self.lbd[clause_id]:
+            self._promote(clause_id, lbd)
+
+    def shorten(self, clause_id, size):
+        '''
+        Called for a learned clause shortened to size literals (e.g. by a level 0 simplification). Its LBD
+        is at most its size, so a clause shortened to two literals moves to the core tier: it is watched in
+        the binary implication lists then, which a reduction does not clean.
+        '''
+        if size < self.lbd[clause_id]:
+            self._promote(clause_id, size)
+
+    def _promote(self, clause_id, lbd):
+        self.lbd[clause_id] = lbd
+        # promote the clause if it is in a lower tier (demoted mid clauses are in the local tier)
+        new_tier = self.tier_of(lbd)
+        for tier in range(new_tier + 1, LOCAL + 1):
+            if clause_id in self.tiers[tier]:
+                self.tiers[tier].discard(clause_id)
+                self.tiers[new_tier].add(clause_id)
+                break
+
+    def _rescale(self):
+        for clause_id in self.activity:
+            self.activity[clause_id] *= 1 / ACTIVITY_LIMIT
+        self._activity_inc *= 1 / ACTIVITY_LIMIT
+
+    def on_conflict(self):
+        ''' Count a conflict and decay the activities (by growing the increment) '''
+        self.conflicts += 1
+        self._activity_inc /= self._decay
+        if self._activity_inc > ACTIVITY_LIMIT:
+            self._rescale()
+
+    def reduce_due(self):
+        return self.next_reduce is not None and self.conflicts >= self.next_reduce
+
+    def select_for_deletion(self, is_locked):
+        '''
+        Start a reduction: the unused mid tier clauses move to the local tier, and the less active half
+        of the local tier is returned (and removed from the database), skipping the clauses for which
+        is_locked(clause_id) is True.
+        '''
+        self.reductions += 1
+        self._reduce_interval += self._reduce_increment
+        self.next_reduce = self.conflicts + self._reduce_interval
+
+        core, mid, local = self.tiers
+        for clause_id in [clause_id for clause_id in mid
+                          if self.reductions - self._last_used[clause_id] > MID_TIER_LIFETIME]:
+            mid.discard(clause_id)
+            local.add(clause_id)
+
+        activity = self.activity
+        candidates = sorted(local, key=lambda clause_id: activity[clause_id])
+        to_delete = [clause_id for clause_id in candidates[:len(candidates) // 2] if not is_locked(clause_id)]
+        for clause_id in to_delete:
+            self._forget(clause_id)
+        return to_delete
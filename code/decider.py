@@ -1,41 +1,110 @@
+import numpy as np
 from utils import PriorityQueue
 
+# EVSIDS: the scores and the increment are rescaled when the increment exceeds this bound
+VSIDS_RESCALE_LIMIT = 1e100
+# a seed perturbs the initial CHB and LRB scores by less than this amount
+SEED_SCORE_NOISE = 1e-6
+# chb_update() rewards fewer plays than this in a Python loop, the NumPy call overhead outweighs it
+CHB_BATCH_MIN = 16
+
 
 class Decider:
+    """
+    Manager of the decision heuristics (VSIDS, CHB, LRB and VMTF) switched by the restarter.
+
+    The scores of all the heuristics are always kept up to date, but only the active one
+    has a priority queue. Whether a variable is assigned is tracked apart from the queue
+    (self.unassigned), and the queue is lazy: assigned variables are not removed from it
+    when they are implied, they are skipped when they reach the top in `decide_var()`.
+    Unassigned variables are (re)inserted by `backtrack_update()`.
+    Switching heuristic builds the queue of the new one in O(n) from its scores, with
+    only the unassigned variables, and switching to the active heuristic costs nothing.
+
+    VMTF (variable move-to-front) uses no priority queue but a doubly linked list of the
+    variables, ordered by the timestamp of their last bump (the most recent at the end).
+    The variables of a learned clause are moved to the end in O(1) each. The search for a
+    decision starts at a cached pointer, all the variables after which are assigned, and
+    walks towards the older variables, so its cost is amortized over the decisions.
 
-    def __init__(self, decider, sentence, num_vars) -> None:
-        if decider is None or decider not in ["LRB", "CHB","VSIDS"]:
-            raise ValueError('The decider must be one from the list ["VSIDS","LRB","CHB"]')
+    The CHB and LRB bookkeeping (scores, lastConflict, assigned, participated, reasoned) is
+    kept in NumPy arrays, and the rewards and score updates are applied to whole index arrays
+    at once (the plays of a BCP, the variables unassigned by a backtrack). The plays of a short
+    BCP (fewer than CHB_BATCH_MIN) are rewarded one by one, with the same arithmetic.
+
+    A non zero seed diversifies the solvers of a portfolio: the initial phases are random and
+    the ties of the initial scores (and of the initial VMTF order) are broken at random.
+    """
+
+    def __init__(self, decider, sentence, num_vars, vsids_decay=0, seed=0) -> None:
+        if decider is None or decider not in ["LRB", "CHB","VSIDS","VMTF"]:
+            raise ValueError('The decider must be one from the list ["VSIDS","LRB","CHB","VMTF"]')
 
         self.num_vars = num_vars
         self.curr_decider = None
+        # the priority queue of the current decide heuristic
+        self.priority_queue = None
+        # unassigned[var] is False while var is assigned
+        self.unassigned = [True] * (num_vars + 1)
+        self.unassigned[0] = False
 
         # VSIDS init
         self.vsids_incr = 1
+        # EVSIDS if the decay is in (0, 1): the increment is multiplied by 1/decay after each conflict,
+        # otherwise it grows additively
+        if vsids_decay < 0 or vsids_decay >= 1:
+            raise ValueError('The VSIDS decay must be in (0, 1), or 0 for the additive increment')
+        self.vsids_decay = vsids_decay
         self.vsids_scores = [0]*(2*num_vars+1)
 
-        for clause in sentence:
-            for lit in clause:
+        # sentence is the ClauseArena of the solver
+        lits = sentence.lits
+        for clause_id in sentence.ids():
+            offset = sentence.offsets[clause_id]
+            for lit in lits[offset:offset + sentence.sizes[clause_id]]:
                 self.vsids_scores[lit] += 1
-        self.vsids_priority_queue = PriorityQueue(self.vsids_scores)
 
         # CHB init
         self.plays = set()
         self.chb_alpha = 0.4
         self.numConflicts = 0
-        self.lastConflict = [0] * (num_vars + 1)
+        self.lastConflict = np.zeros(num_vars + 1, dtype=np.int64)
         self.chb_phase = [0] * (num_vars + 1)
-        self.chb_scores = [0] * (num_vars + 1)  # only record variables, not literals
+        self.chb_scores = np.zeros(num_vars + 1)  # only record variables, not literals
 
         # LRB init
         self.lrb_alpha = 0.4
         self.LearntCounter = 0
-        self.lrb_scores = [0] * (num_vars + 1)
-        self.assigned = [0] * (num_vars + 1)
-        self.participated = [0] * (num_vars + 1)
+        self.lrb_scores = np.zeros(num_vars + 1)
+        self.assigned = np.zeros(num_vars + 1, dtype=np.int64)
+        self.participated = np.zeros(num_vars + 1, dtype=np.int64)
         self.lrb_phase = [0] * (num_vars + 1)
         # rsr extension
-        self.reasoned = [0] * (num_vars + 1)
+        self.reasoned = np.zeros(num_vars + 1, dtype=np.int64)
+
+        if seed:
+            rng = np.random.default_rng(seed)
+            phases = rng.integers(0, 2, num_vars + 1).tolist()
+            self.chb_phase = list(phases)
+            self.lrb_phase = list(phases)
+            # the occurrence counts are integers, a noise below 1 only breaks their ties
+            self.vsids_scores = (np.array(self.vsids_scores) + rng.random(2 * num_vars + 1)).tolist()
+            self.chb_scores += SEED_SCORE_NOISE * rng.random(num_vars + 1)
+            self.lrb_scores += SEED_SCORE_NOISE * rng.random(num_vars + 1)
+
+        # VMTF init: the linked list of the variables (0 is the null link) and their bump timestamps
+        self.vmtf_prev = [0] * (num_vars + 1)
+        self.vmtf_next = [0] * (num_vars + 1)
+        self.vmtf_stamp = [0] * (num_vars + 1)
+        self.vmtf_first = 0
+        self.vmtf_last = 0
+        self.vmtf_stamp_counter = 0
+        # the variables after vmtf_search in the list are all assigned
+        self.vmtf_search = 0
+        # the initial order follows the number of occurrences, the most frequent variables last
+        for var in sorted(range(1, num_vars + 1), key=lambda v: self.vsids_scores[v] + self.vsids_scores[v + num_vars]):
+            self.vmtf_enqueue(var)
+        self.vmtf_search = self.vmtf_last
 
         # build PriorityQueue correspond to the current decide heuristic method
         self.change_heuristic(decider)
@@ -50,40 +119,42 @@ class Decider:
 
     def decide_var(self):
         # called when needs a decide
-        if self.curr_decider == "VSIDS":
-            literal = self.vsids_priority_queue.get_top()
-            if literal == -1:
+        if self.curr_decider == "VMTF":
+            var = self.vmtf_search
+            while var and not self.unassigned[var]:
+                var = self.vmtf_prev[var]
+            if var == 0:
                 return -1, None
-            var = self.get_var_from_literal(literal)
-            is_neg = self.is_negative_literal(literal)
-            value_to_set = not is_neg
-            if is_neg:
-                self.vsids_priority_queue.remove(var)
-            else:
-                self.vsids_priority_queue.remove(var+self.num_vars)
+            self.vmtf_search = var
+        else:
+            # the queue is lazy, the assigned variables on the top are dropped
+            while True:
+                key = self.priority_queue.get_top()
+                if key == -1:
+                    return -1, None
+                var = self.get_var_from_literal(key)
+                if self.unassigned[var]:
+                    break
 
+        if self.curr_decider == "VSIDS":
+            # the keys of the VSIDS queue are literals
+            value_to_set = not self.is_negative_literal(key)
             self.chb_phase[var] = value_to_set
             self.lrb_phase[var] = value_to_set
 
         elif self.curr_decider == "CHB":
-            var = self.chb_priority_queue.get_top()
-            if var == -1:
-                return -1, None
             value_to_set = bool(self.chb_phase[var])
-
-            self.vsids_priority_queue.remove(var)
-            self.vsids_priority_queue.remove(var+self.num_vars)
             self.lrb_phase[var] = value_to_set
 
-        else:  # LRB
-            var = self.lrb_priority_queue.get_top()
-            if var == -1:
-                return -1, None
+        elif self.curr_decider == "LRB":
             value_to_set = bool(self.lrb_phase[var])
-            self.vsids_priority_queue.remove(var)
-            self.vsids_priority_queue.remove(var+self.num_vars)
             self.chb_phase[var] = value_to_set
 
+        else:  # VMTF, with the saved phase
+            value_to_set = bool(self.chb_phase[var])
+            self.lrb_phase[var] = value_to_set
+
+        self.unassigned[var] = False
         self.plays = set([var])
         # LRB: this corresponds to OnAssign by branching
         self.assigned[var] = self.LearntCounter
@@ -94,11 +165,8 @@ class Decider:
         return var, value_to_set
     
     def unary_update(self,var):
-        # if self.curr_decider == "VSIDS":
-        self.vsids_priority_queue.remove(var)
-        self.vsids_priority_queue.remove(var+self.num_vars)
-        if self.curr_decider == "CHB":
-            self.chb_priority_queue.remove(var)          
+        # var is assigned at level 0 and will never be unassigned
+        self.unassigned[var] = False
 
 
     def conflict_update(self, learned_clause, uip, conflict_side, reasons):
@@ -111,38 +179,82 @@ class Decider:
         for lit in learned_clause:
             # update vsids
             self.vsids_scores[lit] += self.vsids_incr
-            # if self.curr_decider == "VSIDS":
-            self.vsids_priority_queue.increase_update(lit, self.vsids_incr)
-            # update chb
-            var = self.get_var_from_literal(lit)
-            self.lastConflict[var] = self.numConflicts
+            if self.curr_decider == "VSIDS":
+                self.priority_queue.increase_update(lit, self.vsids_incr)
+        # update chb
+        self.lastConflict[np.fromiter(var_learnt_clause, dtype=np.int64, count=len(var_learnt_clause))] = self.numConflicts
         # give more weightage to the recent conflict clausing literal
-        self.vsids_incr += 0.75
+        if self.vsids_decay:
+            self.vsids_incr /= self.vsids_decay
+            if self.vsids_incr > VSIDS_RESCALE_LIMIT:
+                self.rescale_vsids()
+        else:
+            self.vsids_incr += 0.75
         if self.chb_alpha > 0.06:
             self.chb_alpha -= 1e-6
         self.plays = set([uip])
         # update lrb
         if self.lrb_alpha > 0.06:
             self.lrb_alpha -= 1e-6
-        for var in set(conflict_side+var_learnt_clause):
-            self.participated[var] += 1
+        participants = set(conflict_side)
+        participants.update(var_learnt_clause)
+        self.participated[np.fromiter(participants, dtype=np.int64, count=len(participants))] += 1
+        # update vmtf
+        self.vmtf_bump(var_learnt_clause)
         # rsr extension
-        for var in set(reasons)-set(learned_clause):
-            self.reasoned[var] += 1
+        reasoned = set(reasons)
+        reasoned.difference_update(learned_clause)
+        self.reasoned[np.fromiter(reasoned, dtype=np.int64, count=len(reasoned))] += 1
+
+    def vmtf_enqueue(self, var):
+        # append var at the end of the list, with a new timestamp
+        self.vmtf_prev[var] = self.vmtf_last
+        self.vmtf_next[var] = 0
+        if self.vmtf_last:
+            self.vmtf_next[self.vmtf_last] = var
+        else:
+            self.vmtf_first = var
+        self.vmtf_last = var
+        self.vmtf_stamp_counter += 1
+        self.vmtf_stamp[var] = self.vmtf_stamp_counter
+
+    def vmtf_dequeue(self, var):
+        prev_var = self.vmtf_prev[var]
+        next_var = self.vmtf_next[var]
+        if prev_var:
+            self.vmtf_next[prev_var] = next_var
+        else:
+            self.vmtf_first = next_var
+        if next_var:
+            self.vmtf_prev[next_var] = prev_var
+        else:
+            self.vmtf_last = prev_var
+
+    def vmtf_bump(self, var_list):
+        # move the variables to the end of the list, keeping their relative order
+        stamp = self.vmtf_stamp
+        for var in sorted(set(var_list), key=lambda v: stamp[v]):
+            if var != self.vmtf_last:
+                if var == self.vmtf_search:
+                    self.vmtf_search = self.vmtf_prev[var] or self.vmtf_next[var]
+                self.vmtf_dequeue(var)
+                self.vmtf_enqueue(var)
+            if self.unassigned[var]:
+                self.vmtf_search = var
+
+    def rescale_vsids(self):
+        # scaling all the scores by the same factor keeps their order, so the queue stays a heap
+        factor = 1 / VSIDS_RESCALE_LIMIT
+        self.vsids_scores = [score * factor for score in self.vsids_scores]
+        self.vsids_incr *= factor
+        if self.curr_decider == "VSIDS":
+            self.priority_queue.rescale(factor)
 
     def bcp_update(self, var, value_to_set):
         # called when var is implied in bcp
         # value_to_set is needed to keep the chb_phase
-        # update vsids
-        # if self.curr_decider == "VSIDS":
-        self.vsids_priority_queue.remove(var)
-        self.vsids_priority_queue.remove(var+self.num_vars)
-        # update chb
-        if self.curr_decider == "CHB":
-            self.chb_priority_queue.remove(var)
-        elif self.curr_decider == "LRB":
-            self.lrb_priority_queue.remove(var)
-
+        # var stays in the (lazy) priority queue
+        self.unassigned[var] = False
         self.chb_phase[var] = int(value_to_set)
         # update lrb, correspond to OnAssign by propagation
         self.assigned[var] = self.LearntCounter
@@ -152,48 +264,91 @@ class Decider:
         self.reasoned[var] = 0
 
     def chb_update(self, propagated, in_conflict):
-        self.plays = self.plays.union(set(propagated))
+        self.plays.update(propagated)
         if in_conflict:
             multiplier = 1.0
         else:
             multiplier = 0.9
-        for v in self.plays:
-            reward = multiplier / (self.numConflicts -
-                                   self.lastConflict[v] + 1)
-            delta = self.chb_alpha * (reward - self.chb_scores[v])
-            self.chb_scores[v] += delta
-            if self.curr_decider == "CHB":
-                self.chb_priority_queue.increase_update(v, delta)
-
-    def backtrack_update(self, var_list, restart_flag):
+        if len(self.plays) < CHB_BATCH_MIN:
+            chb_scores = self.chb_scores
+            last_conflict = self.lastConflict
+            num_conflicts = self.numConflicts + 1
+            update = self.priority_queue.increase_update if self.curr_decider == "CHB" else None
+            for v in self.plays:
+                reward = multiplier / (num_conflicts - last_conflict.item(v))
+                score = chb_scores.item(v)
+                delta = self.chb_alpha * (reward - score)
+                chb_scores[v] = score + delta
+                if update is not None:
+                    update(v, delta)
+            return
+        plays = np.fromiter(self.plays, dtype=np.int64, count=len(self.plays))
+        reward = multiplier / (self.numConflicts + 1 - self.lastConflict[plays])
+        delta = self.chb_alpha * (reward - self.chb_scores[plays])
+        self.chb_scores[plays] += delta
+        if self.curr_decider == "CHB":
+            for v, d in zip(plays.tolist(), delta.tolist()):
+                self.priority_queue.increase_update(v, d)
+
+    def backtrack_update(self, var_list):
         # called when backtrack unassigns some vars, put them in priority_queue
         # var_list: vars unassigned
+        if not var_list:
+            return
+        unassigned = self.unassigned
         for var in var_list:
-            if not restart_flag:
-                # update vsids
-                # if self.curr_decider == "VSIDS":
-                self.vsids_priority_queue.add(var, self.vsids_scores[var])
-                self.vsids_priority_queue.add(var + self.num_vars, self.vsids_scores[var + self.num_vars])
-                # update chb
-                if self.curr_decider == "CHB":
-                    self.chb_priority_queue.add(var, self.chb_scores[var])
-                # update lrb, which corresponds to OnUnassign
-                elif self.curr_decider == "LRB":
-                    self.lrb_priority_queue.add(var, self.lrb_scores[var])
-            interval = self.LearntCounter - self.assigned[var]
-            if interval > 0:
-                r = self.participated[var]/interval
-                rsr = self.reasoned[var]/interval
-                delta = self.lrb_alpha*(r+rsr-self.lrb_scores[var])
-                self.lrb_scores[var] += delta
-                if self.curr_decider == "LRB":
-                    self.lrb_priority_queue.increase_update(var, delta)
+            unassigned[var] = True
+
+        # update lrb, which corresponds to OnUnassign
+        variables = np.array(var_list, dtype=np.int64)
+        interval = self.LearntCounter - self.assigned[variables]
+        rewarded = interval > 0
+        lrb_vars = variables[rewarded]
+        interval = interval[rewarded]
+        r = self.participated[lrb_vars]/interval
+        rsr = self.reasoned[lrb_vars]/interval
+        delta = self.lrb_alpha*(r+rsr-self.lrb_scores[lrb_vars])
+        self.lrb_scores[lrb_vars] += delta
+
+        # only the queue of the current heuristic is kept
+        priority_queue = self.priority_queue
+        if self.curr_decider == "VMTF":
+            stamp = self.vmtf_stamp
+            for var in var_list:
+                if stamp[var] > stamp[self.vmtf_search]:
+                    self.vmtf_search = var
+        elif self.curr_decider == "VSIDS":
+            for var in var_list:
+                priority_queue.add(var, self.vsids_scores[var])
+                priority_queue.add(var + self.num_vars, self.vsids_scores[var + self.num_vars])
+        else:
+            # the variables still in the (lazy) queue only need a new position if their score changed
+            if self.curr_decider == "LRB":
+                changed = delta != 0
+                for var, d in zip(lrb_vars[changed].tolist(), delta[changed].tolist()):
+                    priority_queue.increase_update(var, d)
+                scores = self.lrb_scores
+            else:
+                scores = self.chb_scores
+            indices = priority_queue.indices
+            missing = [var for var in var_list if indices[var] == -1]
+            for var, score in zip(missing, scores[missing].tolist()):
+                priority_queue.add(var, score)
 
     def change_heuristic(self, new_heuristic):
+        # the scores of the inactive heuristics are up to date, only the queue is built
+        if new_heuristic == self.curr_decider:
+            return
         self.curr_decider = new_heuristic
-        # if self.curr_decider == "VSIDS":
-        #     self.vsids_priority_queue = PriorityQueue(self.vsids_scores)
-        if self.curr_decider == "CHB":
-            self.chb_priority_queue = PriorityQueue(self.chb_scores)
-        elif self.curr_decider == "LRB":
-            self.lrb_priority_queue = PriorityQueue(self.lrb_scores)
+        if self.curr_decider == "VMTF":
+            # the search pointer is not kept while VMTF is inactive
+            self.priority_queue = None
+            self.vmtf_search = self.vmtf_last
+            return
+        free_vars = [var for var in range(1, self.num_vars + 1) if self.unassigned[var]]
+        if self.curr_decider == "VSIDS":
+            self.priority_queue = PriorityQueue(self.vsids_scores, free_vars + [var + self.num_vars for var in free_vars])
+        elif self.curr_decider == "CHB":
+            self.priority_queue = PriorityQueue(self.chb_scores.tolist(), free_vars)
+        else:
+            self.priority_queue = PriorityQueue(self.lrb_scores.tolist(), free_vars)
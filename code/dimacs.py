@@ -0,0 +1,167 @@
+import os
+import re
+import bz2
+import gzip
+import lzma
+from array import array
+from itertools import compress, count
+
+# Size of the binary chunks read from the input file
+CHUNK_SIZE = 1 << 20
+
+# compressed formats: (magic bytes, file extension, opener)
+COMPRESSED_FORMATS = [
+    (b"\x1f\x8b", ".gz", gzip.open),
+    (b"\xfd7zXZ\x00", ".xz", lzma.open),
+    (b"BZh", ".bz2", bz2.open),
+]
+
+_HEADER = re.compile(rb"^[ \t]*p[ \t]+cnf[ \t]+(\d+)[ \t]+(\d+)", re.MULTILINE)
+_TRAILER = re.compile(rb"^[ \t]*%", re.MULTILINE)
+# comment lines and the header line, which hold no literal
+_SKIPPED_LINE = re.compile(rb"^[ \t]*[cp].*$", re.MULTILINE)
+
+
+def open_cnf(cnf_filename):
+    '''
+    Open a .cnf file for binary reading.
+    Compressed files (gzip, xz, bzip2) are recognized by their magic bytes, or by
+    their extension, and decompressed on the fly while being read.
+    '''
+    with open(cnf_filename, "rb") as cnf_file:
+        magic = cnf_file.read(8)
+    for format_magic, extension, opener in COMPRESSED_FORMATS:
+        if magic.startswith(format_magic):
+            return opener(cnf_filename, "rb")
+    for format_magic, extension, opener in COMPRESSED_FORMATS:
+        if cnf_filename.endswith(extension):
+            return opener(cnf_filename, "rb")
+    return open(cnf_filename, "rb")
+
+
+def strip_cnf_extension(cnf_filename):
+    '''
+    Return the case name of a .cnf file, e.g. bmc-1 for examples/bmc-1.cnf or examples/bmc-1.cnf.xz
+    '''
+    name = os.path.basename(cnf_filename)
+    for format_magic, extension, opener in COMPRESSED_FORMATS:
+        if name.endswith(extension):
+            name = name[:-len(extension)]
+            break
+    return os.path.splitext(name)[0]
+
+
+class DimacsParser:
+    """
+    Streaming parser for DIMACS .cnf files.
+
+    The file is read in large binary chunks and the literals are written straight
+    into flat integer arrays, so no per-line strings or per-clause lists are built.
+    Clauses may span several lines, blank lines are ignored and the parsing stops at
+    a `%` trailer (as found in the SATLIB benchmarks). Compressed files are
+    decompressed chunk by chunk, so only the parsed formula is kept in memory.
+
+    Attributes:
+        num_vars: number of variables given in the `p cnf` header
+        num_clauses: number of clauses given in the `p cnf` header
+        clause_count: number of clauses actually read
+        literals: array of the DIMACS literals (signed ints), every clause is terminated by a 0
+        offsets: array of size clause_count + 1, clause i is literals[offsets[i]:offsets[i+1]-1]
+        num_bytes: number of (decompressed) bytes read from the file
+    """
+
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.num_vars = 0
+        self.num_clauses = 0
+        self.clause_count = 0
+        self.literals = array('i')
+        self.offsets = array('i', [0])
+        self.num_bytes = 0
+        self._has_header = False
+
+    def parse(self, cnf_filename):
+        ''' Parse the whole (possibly compressed) file, returns the parser itself '''
+        with open_cnf(cnf_filename) as cnf_file:
+            self.parse_stream(cnf_file)
+        return self
+
+    def parse_stream(self, stream):
+        '''
+        Parse a binary stream (anything with a `read(size)` method) chunk by chunk.
+        '''
+        rest = b""
+        while True:
+            chunk = stream.read(self.chunk_size)
+            if not chunk:
+                break
+            self.num_bytes += len(chunk)
+            chunk = rest + chunk
+            # keep the last (possibly incomplete) line for the next round
+            cut = chunk.rfind(b"\n") + 1
+            rest = chunk[cut:]
+            if not self._parse_chunk(chunk[:cut]):
+                rest = b""
+                break
+        if rest:
+            self._parse_chunk(rest)
+        self._finish()
+
+    def _parse_chunk(self, chunk):
+        '''
+        Parse a chunk made of complete lines.
+        Returns False if the `%` trailer was met and the parsing should stop.
+        '''
+        go_on = True
+        if b"c" in chunk or b"p" in chunk or b"%" in chunk:
+            # only the chunks holding comments, the header or the trailer get here
+            trailer = _TRAILER.search(chunk)
+            if trailer:
+                chunk = chunk[:trailer.start()]
+                go_on = False
+            header = _HEADER.search(chunk)
+            if header:
+                self._read_header(header.group(1, 2))
+            chunk = _SKIPPED_LINE.sub(b"", chunk)
+
+        tokens = chunk.split()
+        if not tokens:
+            return go_on
+        if not self._has_header:
+            raise ValueError("The .cnf file has clauses before the 'p cnf' header")
+
+        ints = array('i', map(int, tokens))
+        if max(ints) > self.num_vars or -min(ints) > self.num_vars:
+            raise ValueError("The .cnf file has a literal out of the range given in the 'p cnf' header")
+
+        # every 0 closes a clause, the next clause starts right after it
+        base = len(self.literals)
+        ends = array('i', compress(count(base + 1), map((0).__eq__, ints)))
+        self.literals.extend(ints)
+
+        first = self.clause_count + 1
+        last = first + len(ends)
+        offsets = self.offsets
+        if last > len(offsets):
+            offsets.extend(array('i', [0]) * (last - len(offsets)))
+        offsets[first:last] = ends
+        self.clause_count += len(ends)
+        return go_on
+
+    def _read_header(self, words):
+        self.num_vars = int(words[0])
+        self.num_clauses = int(words[1])
+        self._has_header = True
+        # preallocate the clause offsets from the header
+        self.offsets = array('i', [0]) * (self.num_clauses + 1)
+
+    def _finish(self):
+        if not self._has_header:
+            raise ValueError("The .cnf file has no 'p cnf' header")
+        # drop an unterminated last clause and the unused preallocated offsets
+        del self.literals[self.offsets[self.clause_count]:]
+        del self.offsets[self.clause_count + 1:]
+
+    def clause(self, i):
+        ''' Return the i-th clause as an array of DIMACS literals '''
+        return self.literals[self.offsets[i]:self.offsets[i + 1] - 1]
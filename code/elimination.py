@@ -0,0 +1,221 @@
+import time
+from utils import PriorityQueue
+
+# variables with more occurrences (both polarities together) are not eliminated
+BVE_OCCURRENCE_LIMIT = 40
+# an elimination may add at most so many clauses more than it removes
+BVE_CLAUSE_GROWTH = 0
+# an elimination is given up if one of its resolvents is longer
+BVE_RESOLVENT_LENGTH_LIMIT = 16
+
+
+class VariableEliminator:
+    """
+    Bounded variable elimination on the clauses of a `SAT` solver, run before the search.
+
+    Every clause holding a literal of an eliminated variable x is replaced by all the non
+    tautological resolvents on x, if they are not more numerous than the replaced clauses
+    (clause_growth allows a few more) and none of them is longer than resolvent_length_limit.
+
+    The occurrence lists of the literals are kept up to date while clauses are removed and
+    added, and the candidate variables are taken from a heap ordered by the cost of their
+    elimination, the number of resolvents |occ(x)| * |occ(-x)|, the cheapest first. The
+    variables whose occurrences change are rescheduled. Every resolvent is used for backward
+    subsumption, and the removed clauses are pushed on the reconstruction stack of the solver.
+    Clauses satisfied at level 0 are removed, and literals False at level 0 are left out of
+    the resolvents.
+
+    Attributes:
+        occurs: occurs[lit] is the set of the ids of the clauses holding lit
+        eliminated: eliminated[var] is True if var was eliminated
+    """
+
+    def __init__(self, solver, occurrence_limit=BVE_OCCURRENCE_LIMIT, clause_growth=BVE_CLAUSE_GROWTH,
+                 resolvent_length_limit=BVE_RESOLVENT_LENGTH_LIMIT):
+        self.solver = solver
+        self.sentence = solver.sentence
+        self.num_vars = solver._num_vars
+        self.values = solver._values
+        self.stats = solver.stats
+        self.occurrence_limit = occurrence_limit
+        self.clause_growth = clause_growth
+        self.resolvent_length_limit = resolvent_length_limit
+
+        self.occurs = [set() for _ in range(2 * self.num_vars + 1)]
+        self.eliminated = [False] * (self.num_vars + 1)
+        # marks[lit] == stamp while lit is in the clause being checked
+        self.marks = [0] * (2 * self.num_vars + 1)
+        self.stamp = 0
+        # the variables whose occurrences changed since they were last scheduled
+        self.touched = set()
+        self.queue = None
+
+    def negate(self, lit):
+        return lit - self.num_vars if lit > self.num_vars else lit + self.num_vars
+
+    def var_of(self, lit):
+        return lit - self.num_vars if lit > self.num_vars else lit
+
+    def cost(self, var):
+        ''' Cost of the elimination of var, None if it is not a candidate '''
+        num_pos = len(self.occurs[var])
+        num_neg = len(self.occurs[var + self.num_vars])
+        if self.values[var] != -1 or self.eliminated[var] or num_pos + num_neg == 0 \
+                or num_pos + num_neg > self.occurrence_limit:
+            return None
+        return num_pos * num_neg
+
+    def run(self):
+        '''
+        Eliminate the variables, returns the list of the eliminated variables.
+        The formula is found UNSAT if the solver result is set to "UNSAT".
+        '''
+        start_time = time.time()
+        sentence = self.sentence
+        values = self.values
+        for clause_id in list(sentence.ids()):
+            clause = sentence.clause(clause_id)
+            if any(values[lit] == 1 for lit in clause):
+                self.remove_clause(clause_id, clause)
+                continue
+            for lit in clause:
+                self.occurs[lit].add(clause_id)
+
+        scores = [0] * (self.num_vars + 1)
+        candidates = []
+        for var in range(1, self.num_vars + 1):
+            cost = self.cost(var)
+            if cost is not None:
+                scores[var] = -cost
+                candidates.append(var)
+        # the cheapest variable on the top
+        self.queue = PriorityQueue(scores, candidates)
+        self.touched.clear()
+
+        eliminated_vars = []
+        while self.stats._result != "UNSAT":
+            var = self.queue.get_top()
+            if var == -1:
+                break
+            if self.cost(var) is None:
+                continue
+            if self.eliminate(var):
+                eliminated_vars.append(var)
+            self.schedule_touched()
+
+        self.stats._bve_vars += len(eliminated_vars)
+        self.stats._bve_time += time.time() - start_time
+        return eliminated_vars
+
+    def schedule_touched(self):
+        for var in self.touched:
+            cost = self.cost(var)
+            if cost is None:
+                self.queue.remove(var)
+            else:
+                self.queue.add(var, -cost)
+        self.touched.clear()
+
+    def remove_clause(self, clause_id, clause):
+        self.sentence.delete(clause_id)
+        self.stats._bve_rm_clauses += 1
+        for lit in clause:
+            self.occurs[lit].discard(clause_id)
+            self.touched.add(self.var_of(lit))
+
+    def add_clause(self, clause):
+        clause_id = self.sentence.add(clause)
+        self.stats._bve_add_clauses += 1
+        for lit in clause:
+            self.occurs[lit].add(clause_id)
+            self.touched.add(self.var_of(lit))
+        return clause_id
+
+    def resolvents(self, var):
+        '''
+        The non tautological resolvents on var, without the literals False at level 0.
+        Returns None if they go over the limits. The clauses satisfied at level 0 are already
+        removed, so are the resolvents.
+        '''
+        sentence = self.sentence
+        values = self.values
+        marks = self.marks
+        pos_clauses = [sentence.clause(clause_id) for clause_id in self.occurs[var]]
+        neg_clauses = [sentence.clause(clause_id) for clause_id in self.occurs[var + self.num_vars]]
+        limit = len(pos_clauses) + len(neg_clauses) + self.clause_growth
+        neg_var = var + self.num_vars
+        resolvents = []
+        for pos_clause in pos_clauses:
+            self.stamp += 1
+            stamp = self.stamp
+            base = []
+            for lit in pos_clause:
+                if lit != var and values[lit] != 0:
+                    marks[lit] = stamp
+                    base.append(lit)
+            for neg_clause in neg_clauses:
+                resolvent = list(base)
+                for lit in neg_clause:
+                    if lit == neg_var or values[lit] == 0 or marks[lit] == stamp:
+                        continue
+                    if marks[self.negate(lit)] == stamp:
+                        break
+                    resolvent.append(lit)
+                else:
+                    if len(resolvent) > self.resolvent_length_limit or len(resolvents) == limit:
+                        return None
+                    resolvents.append(resolvent)
+        return resolvents
+
+    def eliminate(self, var):
+        ''' Try to eliminate var, returns True if it was eliminated '''
+        resolvents = self.resolvents(var)
+        if resolvents is None:
+            return False
+
+        sentence = self.sentence
+        reconstruction = self.solver._reconstruction
+        for lit in (var, var + self.num_vars):
+            for clause_id in list(self.occurs[lit]):
+                clause = sentence.clause(clause_id)
+                reconstruction.push(lit, clause)
+                self.remove_clause(clause_id, clause)
+        self.eliminated[var] = True
+
+        for resolvent in resolvents:
+            if len(resolvent) == 0:
+                self.stats._result = "UNSAT"
+                break
+            if len(resolvent) == 1:
+                unit = resolvent[0]
+                if self.values[unit] == 1:
+                    continue
+                if self.solver.add_unit(unit) == 0:
+                    break
+                # the clauses satisfied by the unit are removed
+                for clause_id in list(self.occurs[unit]):
+                    self.remove_clause(clause_id, sentence.clause(clause_id))
+                continue
+            clause_id = self.add_clause(resolvent)
+            self.backward_subsume(clause_id, resolvent)
+        return True
+
+    def backward_subsume(self, clause_id, clause):
+        ''' Remove the clauses subsumed by clause (which has the id clause_id) '''
+        sentence = self.sentence
+        marks = self.marks
+        self.stamp += 1
+        stamp = self.stamp
+        for lit in clause:
+            marks[lit] = stamp
+        size = len(clause)
+        # all the subsumed clauses hold the literal with the fewest occurrences
+        best_lit = min(clause, key=lambda lit: len(self.occurs[lit]))
+        for other_id in list(self.occurs[best_lit]):
+            if other_id == clause_id or sentence.sizes[other_id] < size:
+                continue
+            other = sentence.clause(other_id)
+            if sum(1 for lit in other if marks[lit] == stamp) == size:
+                self.remove_clause(other_id, other)
+                self.stats._bve_rm_clauses -= 1
+                self.stats._bve_subsumed += 1
@@ -0,0 +1,196 @@
+import argparse
+import random
+import time
+from utils import PriorityQueue
+
+
+class OldPriorityQueue:
+    """
+    The `PriorityQueue` before the flat lists, kept for the benchmark only: the heap holds one
+    [priority, element] list per entry, indices[element-1] is its position, and the keys are sifted
+    down recursively with a swap at every level.
+    """
+
+    def __init__(self,start_list):
+        self.size = len(start_list)-1
+        temp = start_list[1:]
+        self.heap = []
+        self.indices = []
+
+        ctr = 1
+        for x in temp:
+            self.heap.append([x,ctr])
+            self.indices.append(ctr-1)
+            ctr += 1
+
+        for i in range(int(self.size/2)-1,-1,-1):
+            self.heapify(i)
+
+    def swap(self,ind1,ind2):
+        temp = self.heap[ind1]
+        self.heap[ind1] = self.heap[ind2]
+        self.heap[ind2] = temp
+
+        p1 = self.heap[ind1][1]
+        p1 -= 1
+        p2 = self.heap[ind2][1]
+        p2 -= 1
+        temp = self.indices[p1]
+        self.indices[p1]=self.indices[p2]
+        self.indices[p2]=temp
+
+    def heapify(self,node_index):
+        maxp = self.heap[node_index][0]
+
+        left_index = 2*node_index+1
+        if left_index<self.size:
+            pr = self.heap[left_index][0]
+            if pr>maxp:
+                maxp = pr
+
+        right_index = 2*node_index+2
+        if right_index<self.size:
+            pr = self.heap[right_index][0]
+            if pr>maxp:
+                maxp = pr
+
+        if maxp != self.heap[node_index][0]:
+            if left_index<self.size and maxp == self.heap[left_index][0]:
+                self.swap(left_index,node_index)
+                self.heapify(left_index)
+            else:
+                self.swap(right_index,node_index)
+                self.heapify(right_index)
+
+    def get_top(self):
+        if self.size == 0:
+            return -1
+
+        top_element = self.heap[0][1]
+
+        self.swap(0,self.size-1)
+        self.indices[self.heap[self.size-1][1]-1]=-1
+        self.size -= 1
+        self.heapify(0)
+
+        return top_element
+
+    def increase_update(self,key,value):
+        if self.indices[key-1] == -1:
+            return
+
+        pos = self.indices[key-1]
+
+        self.heap[pos][0] += value
+
+        par=pos
+        while par!=0:
+            temp = par
+            par = int((par-1)/2)
+            if self.heap[temp][0] > self.heap[par][0]:
+                self.swap(temp,par)
+            else:
+                break
+
+    def remove(self,key):
+        if self.indices[key-1] == -1:
+            return
+
+        pos = self.indices[key-1]
+        this_node_pr = self.heap[pos][0]
+        final_node_pr = self.heap[self.size-1][0]
+        self.swap(pos,self.size-1)
+        self.size -= 1
+        self.indices[key-1] = -1
+
+        if final_node_pr > this_node_pr:
+            par = pos
+            while par!=0:
+                temp = par
+                par = int((par-1)/2)
+                if self.heap[temp][0] > self.heap[par][0]:
+                    self.swap(temp,par)
+                else:
+                    break
+        elif this_node_pr > final_node_pr:
+            self.heapify(pos)
+
+    def add(self,key,value):
+        self.heap[self.size] = [0,key]
+        self.indices[key-1] = self.size
+
+        self.size += 1
+
+        self.increase_update(key,value)
+
+
+def run(queue_class, scores, updates, num_pops, removals, additions):
+    ''' Run the operations on a new heap of queue_class, returns the seconds of every operation '''
+    times = {}
+    start = time.perf_counter()
+    queue = queue_class(scores)
+    times["build"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key, value in updates:
+        queue.increase_update(key, value)
+    times["increase_update"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    popped = [queue.get_top() for _ in range(num_pops)]
+    times["get_top"] = time.perf_counter() - start
+
+    # the popped keys are added back, then as many keys as popped are removed
+    start = time.perf_counter()
+    for key, value in zip(popped, additions):
+        queue.add(key, value)
+    times["add"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in removals:
+        queue.remove(key)
+    times["remove"] = time.perf_counter() - start
+    return times, popped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark of the PriorityQueue of utils.py against the old one")
+    parser.add_argument("--keys", type=int, default=100000, help="number of keys in the heap")
+    parser.add_argument("--ops", type=int, default=200000, help="number of increase_update calls")
+    parser.add_argument("--pops", type=int, default=20000, help="number of get_top, add and remove calls")
+    parser.add_argument("--repeat", type=int, default=3, help="best of so many runs")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random operations")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    num_keys = args.keys
+    scores = [0] + [rng.random() for _ in range(num_keys)]
+    # positive increments only, the old heap only sifts up in increase_update
+    updates = [(rng.randint(1, num_keys), rng.random()) for _ in range(args.ops)]
+    additions = [rng.random() for _ in range(args.pops)]
+    removals = rng.sample(range(1, num_keys + 1), args.pops)
+    counts = {"build": num_keys, "increase_update": args.ops, "get_top": args.pops,
+              "add": args.pops, "remove": args.pops}
+
+    best = {}
+    for name, queue_class in (("old", OldPriorityQueue), ("new", PriorityQueue)):
+        best[name] = None
+        for _ in range(args.repeat):
+            times, popped = run(queue_class, scores, updates, args.pops, removals, additions)
+            if best[name] is None:
+                best[name] = times
+            else:
+                best[name] = {op: min(best[name][op], times[op]) for op in times}
+        best[name + "_popped"] = popped
+    if best["old_popped"] != best["new_popped"]:
+        print("Warning: the heaps popped different keys (ties of the scores)")
+
+    print("{:<16}{:>14}{:>14}{:>10}".format("operation", "old ops/s", "new ops/s", "speedup"))
+    for op, count in counts.items():
+        old_rate = count / best["old"][op]
+        new_rate = count / best["new"][op]
+        print("{:<16}{:>14,.0f}{:>14,.0f}{:>9.2f}x".format(op, old_rate, new_rate, new_rate / old_rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import time
+from clause_db import CORE, MID
+from probing import Prober
+from subsumption import Subsumer
+
+# number of conflicts before the first inprocessing round, the interval grows by INPROCESS_INCREMENT
+INPROCESS_INTERVAL = 5000
+INPROCESS_INCREMENT = 2500
+# effort budget of every technique, as a fraction of the search ticks since the previous round
+VIVIFY_EFFORT = 0.1
+SUBSUME_EFFORT = 0.05
+PROBE_EFFORT = 0.05
+
+
+class Inprocessor:
+    """
+    Schedules the simplification of the formula during the search of a `SAT` solver.
+
+    A round runs at level 0 (after a restart or a learned unit) once enough conflicts were found
+    since the previous one, and applies in turn:
+
+        vivification: the core and mid tier learned clauses not vivified yet are shortened by
+                      assigning the negations of their literals one by one and propagating
+                      (see `vivify_clause()`)
+        subsumption: the learned clauses are subsumed and strengthened by all the clauses
+                     (see `Subsumer`)
+        probing: equivalent literal substitution and failed literal probing (see `Prober`)
+
+    The effort is counted in ticks, the implications plus the clause visits of `SAT.bcp()` (the
+    ticks of the subsumption are its scanned occurrences). Every technique gets a budget, a
+    fraction of the search ticks since the previous round. The watch lists are updated in place
+    for every changed clause (the clauses strengthened by the subsumption get new blockers, the
+    subsumed ones are purged after it), only the substitution of the probing rebuilds them.
+    """
+
+    def __init__(self, solver, interval=INPROCESS_INTERVAL, increment=INPROCESS_INCREMENT):
+        self.solver = solver
+        self.interval = interval
+        self.increment = increment
+        self.next_round = interval
+        # the ticks of the search only, the inprocessing propagations are not counted
+        self.search_ticks = 0
+        self._last_ticks = 0
+        self.vivified = set()
+
+    def ticks(self):
+        stats = self.solver.stats
+        return stats._num_implications + stats._clause_visits
+
+    def due(self):
+        return self.solver._learned_db.conflicts >= self.next_round
+
+    def run(self):
+        ''' One inprocessing round, at level 0 '''
+        start_time = time.time()
+        solver = self.solver
+        stats = solver.stats
+        search_ticks = self.ticks() - self._last_ticks
+        self.search_ticks += search_ticks
+        stats._inprocess_rounds += 1
+
+        if self.propagate():
+            start_ticks = self.ticks()
+            self.vivify(VIVIFY_EFFORT * search_ticks)
+            stats._vivify_ticks += self.ticks() - start_ticks
+
+        if stats._result != "UNSAT":
+            subsumed = stats._learned_subsumed
+            strengthened = stats._learned_strengthened
+            subsumer = Subsumer(solver, learned=True, include_original=True, budget=SUBSUME_EFFORT * search_ticks)
+            subsumer.run()
+            solver.purge_watches()
+            stats._subsume_ticks += subsumer.ticks
+            stats._inprocess_subsumed += stats._learned_subsumed - subsumed
+            stats._inprocess_strengthened += stats._learned_strengthened - strengthened
+
+        if stats._result != "UNSAT":
+            substituted = stats._substituted_vars
+            failed = stats._failed_literals
+            start_ticks = self.ticks()
+            Prober(solver).run(PROBE_EFFORT * search_ticks)
+            stats._probe_ticks += self.ticks() - start_ticks
+            stats._inprocess_substituted += stats._substituted_vars - substituted
+            stats._inprocess_failed += stats._failed_literals - failed
+
+        self._last_ticks = self.ticks()
+        self.next_round = solver._learned_db.conflicts + self.interval
+        self.interval += self.increment
+        stats._inprocess_time += time.time() - start_time
+
+    def propagate(self):
+        ''' Propagate the level 0 assignments, returns False if the formula is UNSAT '''
+        result, _ = self.solver.bcp()
+        if result == "CONFLICT":
+            self.solver.stats._result = "UNSAT"
+            return False
+        return True
+
+    def vivify(self, budget):
+        ''' Vivify the core and mid tier learned clauses, from the lowest LBD, until budget ticks are spent '''
+        solver = self.solver
+        sentence = solver.sentence
+        learned_db = solver._learned_db
+        candidates = [clause_id for tier in (CORE, MID) for clause_id in learned_db.tiers[tier]
+                      if clause_id not in self.vivified and sentence.sizes[clause_id] > 2]
+        candidates.sort(key=lambda clause_id: learned_db.lbd[clause_id])
+
+        start_ticks = self.ticks()
+        for clause_id in candidates:
+            if self.ticks() - start_ticks > budget or solver.stats._result == "UNSAT":
+                break
+            if sentence.is_deleted(clause_id):
+                continue
+            self.vivified.add(clause_id)
+            self.vivify_clause(clause_id)
+
+    def vivify_clause(self, clause_id):
+        '''
+        The literals of the clause are made False one by one, each at a new level, and propagated. If a literal
+        is then found True, the literals made False so far and this one are a clause implied by the formula;
+        if a conflict arises, the literals made False so far are. The literals found False are dropped.
+        The clause is replaced by the shorter clause, if any.
+        '''
+        solver = self.solver
+        sentence = solver.sentence
+        values = solver._values
+        num_vars = solver._num_vars
+        clause = sentence.clause(clause_id)
+        for lit in clause:
+            if values[lit] == 1:
+                # satisfied at level 0
+                return
+
+        new_clause = []
+        for lit in clause:
+            value = values[lit]
+            if value == 1:
+                new_clause.append(lit)
+                break
+            if value == 0:
+                continue
+            new_clause.append(lit)
+            solver._level += 1
+            solver._trail_lim.append(solver._trail_size)
+            solver.assign(lit - num_vars if lit > num_vars else lit + num_vars, None)
+            result, _ = solver.bcp()
+            if result == "CONFLICT":
+                break
+        solver.backtrack(0)
+
+        if len(new_clause) == len(clause):
+            return
+        if not new_clause:
+            # all the literals are False at level 0
+            solver.stats._result = "UNSAT"
+            return
+        stats = solver.stats
+        stats._vivified_clauses += 1
+        stats._vivified_literals += len(clause) - len(new_clause)
+
+        # the literals of the new clause are unassigned at level 0
+        solver.detach_clause(clause_id)
+        if len(new_clause) == 1:
+            sentence.delete(clause_id)
+            solver._learned_db.remove(clause_id)
+            lit = new_clause[0]
+            solver.add_unit(lit)
+            solver.sat_decider.unary_update(lit - num_vars if lit > num_vars else lit)
+            self.propagate()
+            return
+        sentence.replace(clause_id, new_clause)
+        solver._learned_db.shorten(clause_id, len(new_clause))
+        solver.attach_clause(clause_id)
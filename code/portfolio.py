@@ -0,0 +1,155 @@
+import multiprocessing
+import queue
+import time
+from SAT import SAT, write_results
+from sharing import ClauseExchange, create_rings
+from utils import Statistics
+
+# the (decider, restarter, restart base) of the workers after the first one, which runs the given configuration
+PORTFOLIO_CONFIGS = [
+    ("LRB", "GLUCOSE", 1024),
+    ("CHB", "LUBY", 512),
+    ("VMTF", "GEOMETRIC", 256),
+    ("VSIDS", "GLUCOSE", 1024),
+    ("LRB", "LUBY", 256),
+    ("CHB", "GEOMETRIC", 1024),
+    ("VMTF", "LUBY", 128),
+    ("VSIDS", "NO_RESTART", 1024),
+]
+# seconds the other workers get to stop once the answer is found, before they are terminated
+PORTFOLIO_STOP_TIMEOUT = 5
+# seconds between two checks of the workers still alive while waiting for the answer
+PORTFOLIO_POLL_INTERVAL = 1
+
+
+def run_worker(index, config, cnf_filename, stop, results, ring_names=None):
+    '''
+    Solve in a worker process, the statistics (with the model and the original formula of a SAT answer)
+    are put on results. The learned clauses are shared through the rings named ring_names, if any.
+    '''
+    sat = SAT(**config)
+    sat._stop = stop
+    if ring_names is not None:
+        sat.stats._share_flag = True
+        sat._exchange = ClauseExchange(ring_names, index, sat.stats)
+    sat.solve(cnf_filename)
+    if sat._exchange is not None:
+        sat._exchange.close()
+    if sat.stats._result == "SAT":
+        results.put((index, sat.stats, sat.assignment_dict, sat.orig_sentence))
+    else:
+        results.put((index, sat.stats, None, None))
+
+
+class Portfolio:
+    """
+    Runs num_workers `SAT` solvers with different configurations in worker processes, the first
+    SAT or UNSAT answer wins.
+
+    Worker 0 runs the given configuration (a dict of the keyword arguments of `SAT`). Worker i > 0
+    takes its decider (the starting arm of the bandit of the restarter), restarter and restart base
+    from PORTFOLIO_CONFIGS, the base doubled at every new pass over the list, and the seed i, which
+    randomizes the initial phases and score ties of its decider. The other options are shared.
+
+    Once an answer is found the stop event is set: the other workers stop at their next check (see
+    `SAT.solve()`) with the result UNKNOWN and send their statistics, the ones which do not stop
+    within PORTFOLIO_STOP_TIMEOUT seconds (e.g. still preprocessing) are terminated. The statistics
+    of the winner, with the winning worker and a summary of every worker, are the statistics of the
+    portfolio and are stored in Results/ as by `SAT`.
+
+    With share="True" the workers share their short learned clauses through ring buffers in shared
+    memory (see `ClauseExchange`), created and unlinked by the portfolio.
+
+    Attributes (the ones of `SAT` used by solver.py):
+        stats: the statistics of the winner
+        assignment_dict: the model of a SAT answer
+        orig_sentence: the original formula of a SAT answer, for the test
+    """
+
+    def __init__(self, num_workers, config, share="False"):
+        self.share = share
+        self.configs = []
+        for index in range(num_workers):
+            if index == 0:
+                self.configs.append(dict(config))
+                continue
+            decider, restarter, base = PORTFOLIO_CONFIGS[(index - 1) % len(PORTFOLIO_CONFIGS)]
+            base *= 2 ** ((index - 1) // len(PORTFOLIO_CONFIGS))
+            self.configs.append(dict(config, decider=decider, restarter=restarter, base=base, seed=index))
+        self.stats = None
+        self.assignment_dict = None
+        self.orig_sentence = None
+        self._num_vars = 0
+
+    def solve(self, cnf_filename):
+        ''' Solve with all the workers, until the first answer '''
+        start_time = time.time()
+        context = multiprocessing.get_context()
+        stop = context.Event()
+        results = context.Queue()
+        rings = create_rings(len(self.configs)) if self.share == "True" else []
+        ring_names = [ring.name for ring in rings] if rings else None
+        workers = [context.Process(target=run_worker, args=(index, config, cnf_filename, stop, results, ring_names),
+                                   daemon=True)
+                   for index, config in enumerate(self.configs)]
+        for worker in workers:
+            worker.start()
+
+        worker_stats = [None] * len(workers)
+        winner = None
+        deadline = None
+        pending = len(workers)
+        while pending > 0:
+            if deadline is not None and time.time() >= deadline:
+                break
+            timeout = PORTFOLIO_POLL_INTERVAL if deadline is None else deadline - time.time()
+            try:
+                index, stats, assignment_dict, orig_sentence = results.get(timeout=max(timeout, 0))
+            except queue.Empty:
+                if deadline is None and not any(worker.is_alive() for worker in workers):
+                    # no answer will come, the workers died
+                    break
+                continue
+            pending -= 1
+            worker_stats[index] = stats
+            if winner is None and stats._result in ("SAT", "UNSAT"):
+                winner = index
+                self.assignment_dict = assignment_dict
+                self.orig_sentence = orig_sentence
+                stop.set()
+                deadline = time.time() + PORTFOLIO_STOP_TIMEOUT
+
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
+        for ring in rings:
+            ring.close()
+            ring.unlink()
+
+        if winner is not None:
+            self.stats = worker_stats[winner]
+        else:
+            self.stats = Statistics()
+            self.stats._input_file = cnf_filename
+            self.stats._result = "UNKNOWN"
+        self._num_vars = self.stats._num_vars
+        self.stats._portfolio_winner = winner
+        self.stats._portfolio_time = time.time() - start_time
+        self.stats._portfolio_workers = [self.summary(index, stats) for index, stats in enumerate(worker_stats)]
+        write_results(cnf_filename, self.stats, self.assignment_dict)
+
+    def summary(self, index, stats):
+        ''' The configuration of a worker and its main statistics, None if it was terminated '''
+        config = self.configs[index]
+        summary = {"worker": index, "decider": config.get("decider", "VSIDS"),
+                   "restarter": config.get("restarter", "NO_RESTART"), "base": config.get("base", 1024),
+                   "seed": config.get("seed", 0), "result": "TERMINATED"}
+        if stats is not None:
+            summary.update(result=stats._result, time=stats._complete_time - stats._start_time,
+                           conflicts=stats._num_learned_clauses, decisions=stats._num_decisions,
+                           implications=stats._num_implications, restarts=stats._restarts)
+            if stats._share_flag:
+                summary.update(exported=stats._share_exported, imported=stats._share_imported,
+                               useful=stats._share_useful)
+        return summary
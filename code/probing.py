@@ -0,0 +1,271 @@
+import time
+
+# the probing of a round stops after so many implications per live clause
+PROBE_EFFORT = 2
+
+
+class Prober:
+    """
+    Equivalent literal substitution and failed literal probing on the binary implication graph of a `SAT` solver.
+
+    Every binary clause (a, b) gives the edges -a -> b and -b -> a of the graph, whose nodes are the
+    unassigned literals. The literals of a strongly connected component are all equivalent, they are
+    found with an iterative Tarjan and replaced in every clause, original and learned, by the literal
+    of the component with the smallest variable (the representative). A component holding both a
+    literal and its negation makes the formula UNSAT. The substituted variables leave the formula,
+    the equivalence clauses are pushed on the reconstruction stack to assign them in the model.
+
+    Then the roots of the graph (literals implied by no binary clause, but implying other literals)
+    are probed: each one is assigned at level 1 and propagated with all the clauses, a conflict makes
+    its negation a level 0 unit.
+
+    It runs at level 0 with the watches set up (the decider is needed by `SAT.bcp()`), the watches
+    are rebuilt after a substitution.
+
+    Attributes:
+        representative: representative[lit] is the literal lit is replaced by
+        substituted: the variables substituted in this run
+        failed: number of failed literals found in this run
+    """
+
+    def __init__(self, solver):
+        self.solver = solver
+        self.sentence = solver.sentence
+        self.num_vars = solver._num_vars
+        self.values = solver._values
+        self.representative = list(range(2 * self.num_vars + 1))
+        self.substituted = []
+        self.failed = 0
+
+    def negate(self, lit):
+        return lit - self.num_vars if lit > self.num_vars else lit + self.num_vars
+
+    def var_of(self, lit):
+        return lit - self.num_vars if lit > self.num_vars else lit
+
+    def run(self, budget=None):
+        '''
+        Substitute the equivalent literals, then probe the roots with at most budget implications
+        (PROBE_EFFORT implications per live clause if None). The formula is found UNSAT if the solver
+        result is set to "UNSAT".
+        '''
+        start_time = time.time()
+        solver = self.solver
+        stats = solver.stats
+        if budget is None:
+            budget = PROBE_EFFORT * self.sentence.num_live()
+
+        if self.propagate() and self.substitute():
+            self.probe(budget)
+
+        stats._substituted_vars += len(self.substituted)
+        stats._failed_literals += self.failed
+        stats._probe_time += time.time() - start_time
+
+    def propagate(self):
+        ''' Propagate the level 0 assignments, returns False if the formula is UNSAT '''
+        result, _ = self.solver.bcp()
+        if result == "CONFLICT":
+            self.solver.stats._result = "UNSAT"
+            return False
+        return True
+
+    def add_unit(self, lit):
+        ''' Assign lit at level 0, returns False if the formula is UNSAT '''
+        if self.solver.add_unit(lit) == 0:
+            return False
+        self.solver.sat_decider.unary_update(self.var_of(lit))
+        return True
+
+    def binary_graph(self):
+        '''
+        The adjacency lists of the binary implication graph, indexed by literal. The clauses with two
+        unassigned literals, the others False at level 0, are binary clauses too.
+        '''
+        sentence = self.sentence
+        values = self.values
+        lits = sentence.lits
+        offsets = sentence.offsets
+        sizes = sentence.sizes
+        num_vars = self.num_vars
+        graph = [[] for _ in range(2 * num_vars + 1)]
+        for clause_id in sentence.ids():
+            offset = offsets[clause_id]
+            if sizes[clause_id] == 2:
+                lit1 = lits[offset]
+                lit2 = lits[offset + 1]
+                if values[lit1] != -1 or values[lit2] != -1:
+                    continue
+            else:
+                # count the unassigned literals, a True literal stops the count
+                count = 0
+                for lit in lits[offset:offset + sizes[clause_id]]:
+                    value = values[lit]
+                    if value == 1:
+                        count = 3
+                        break
+                    if value == -1:
+                        count += 1
+                        if count == 1:
+                            lit1 = lit
+                        elif count == 2:
+                            lit2 = lit
+                        else:
+                            break
+                if count != 2:
+                    continue
+            graph[lit1 - num_vars if lit1 > num_vars else lit1 + num_vars].append(lit2)
+            graph[lit2 - num_vars if lit2 > num_vars else lit2 + num_vars].append(lit1)
+        return graph
+
+    def components(self, graph):
+        ''' The strongly connected components of graph with more than one literal (iterative Tarjan) '''
+        index = [0] * len(graph)
+        low = [0] * len(graph)
+        on_stack = [False] * len(graph)
+        stack = []
+        counter = 1
+        components = []
+        for root in range(1, len(graph)):
+            if index[root] or not graph[root]:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            # the explicit recursion stack: (node, position of the next successor to visit)
+            work = [(root, 0)]
+            while work:
+                node, i = work[-1]
+                successors = graph[node]
+                if i < len(successors):
+                    work[-1] = (node, i + 1)
+                    successor = successors[i]
+                    if not index[successor]:
+                        index[successor] = low[successor] = counter
+                        counter += 1
+                        stack.append(successor)
+                        on_stack[successor] = True
+                        work.append((successor, 0))
+                    elif on_stack[successor] and index[successor] < low[node]:
+                        low[node] = index[successor]
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        lit = stack.pop()
+                        on_stack[lit] = False
+                        component.append(lit)
+                        if lit == node:
+                            break
+                    if len(component) > 1:
+                        components.append(component)
+        return components
+
+    def substitute(self):
+        ''' Replace the equivalent literals by their representative, returns False if the formula is UNSAT '''
+        solver = self.solver
+        sentence = self.sentence
+        num_vars = self.num_vars
+        representative = self.representative
+        reconstruction = solver._reconstruction
+
+        done = [False] * (num_vars + 1)
+        for component in self.components(self.binary_graph()):
+            rep = min(component, key=self.var_of)
+            if done[self.var_of(rep)]:
+                # the component of the negations, already done
+                continue
+            done[self.var_of(rep)] = True
+            seen = set(component)
+            for lit in component:
+                if self.negate(lit) in seen:
+                    solver.stats._result = "UNSAT"
+                    return False
+            negated_rep = self.negate(rep)
+            for lit in component:
+                if lit == rep:
+                    continue
+                negated_lit = self.negate(lit)
+                representative[lit] = rep
+                representative[negated_lit] = negated_rep
+                # lit is set from rep by the reconstruction
+                reconstruction.push(negated_lit, [negated_lit, rep])
+                reconstruction.push(lit, [lit, negated_rep])
+                self.substituted.append(self.var_of(lit))
+
+        if not self.substituted:
+            return True
+
+        lits = sentence.lits
+        offsets = sentence.offsets
+        sizes = sentence.sizes
+        learned_db = solver._learned_db
+        units = []
+        for clause_id in list(sentence.ids()):
+            offset = offsets[clause_id]
+            clause = lits[offset:offset + sizes[clause_id]]
+            if all(representative[lit] == lit for lit in clause):
+                continue
+            new_clause = list(dict.fromkeys(representative[lit] for lit in clause))
+            new_lits = set(new_clause)
+            tautology = any(self.negate(lit) in new_lits for lit in new_clause)
+            if tautology or len(new_clause) == 1:
+                sentence.delete(clause_id)
+                if sentence.is_learned(clause_id):
+                    learned_db.remove(clause_id)
+                if not tautology:
+                    units.append(new_clause[0])
+                continue
+            sentence.replace(clause_id, new_clause)
+            if sentence.is_learned(clause_id):
+                learned_db.shorten(clause_id, len(new_clause))
+
+        for var in self.substituted:
+            solver.sat_decider.unary_update(var)
+        solver._eliminated_vars += self.substituted
+        for lit in units:
+            if not self.add_unit(lit):
+                return False
+
+        # the watches are rebuilt and the whole level 0 trail propagated again
+        solver.init_watch()
+        solver._qhead = 0
+        solver._bin_qhead = 0
+        for lit in solver._trail[:solver._trail_size]:
+            solver._var_reason[self.var_of(lit)] = None
+        return self.propagate()
+
+    def probe(self, budget):
+        ''' Probe the roots of the binary implication graph until budget implications are made '''
+        solver = self.solver
+        stats = solver.stats
+        values = self.values
+        graph = self.binary_graph()
+        has_parent = [False] * len(graph)
+        for successors in graph:
+            for lit in successors:
+                has_parent[lit] = True
+        roots = [lit for lit in range(1, len(graph)) if graph[lit] and not has_parent[lit]]
+
+        start_implications = stats._num_implications
+        for lit in roots:
+            if stats._num_implications - start_implications > budget:
+                break
+            if values[lit] != -1:
+                continue
+            solver._level = 1
+            solver._trail_lim.append(solver._trail_size)
+            solver.assign(lit, None)
+            result, _ = solver.bcp()
+            solver.backtrack(0)
+            if result == "CONFLICT":
+                self.failed += 1
+                if not self.add_unit(self.negate(lit)) or not self.propagate():
+                    return
@@ -0,0 +1,50 @@
+class ReconstructionStack:
+    """
+    Records the clauses removed by the preprocessing (variable elimination, blocked clauses, ...)
+    to extend a model of the simplified formula into a model of the original formula.
+
+    Every entry is a removed clause together with its witness literal, a literal of the clause
+    that can be made True to satisfy it. `extend()` walks the entries from the last pushed one
+    and makes the witness True whenever its clause is not satisfied by the current assignment.
+    This is sound as long as the clauses of every entry only hold variables which were still in
+    the formula when the entry was pushed.
+
+    Attributes:
+        witnesses: the witness literal of every entry
+        clauses: the removed clause (list of literals) of every entry
+    """
+
+    def __init__(self, num_vars=0):
+        self.num_vars = num_vars
+        self.witnesses = []
+        self.clauses = []
+
+    def __len__(self):
+        return len(self.witnesses)
+
+    def push(self, witness, clause):
+        ''' Record the removed clause, witness is one of its literals '''
+        self.witnesses.append(witness)
+        self.clauses.append(clause)
+
+    def extend(self, values):
+        '''
+        Extend the assignment values (indexed by literal, 1 True, 0 False, -1 unassigned, as in `SAT`)
+        in place. The unassigned variables of the witnesses are set to False first.
+        '''
+        num_vars = self.num_vars
+        for witness in self.witnesses:
+            var = witness - num_vars if witness > num_vars else witness
+            if values[var] == -1:
+                values[var] = 0
+                values[var + num_vars] = 1
+
+        for k in range(len(self.witnesses) - 1, -1, -1):
+            clause = self.clauses[k]
+            for lit in clause:
+                if values[lit] == 1:
+                    break
+            else:
+                witness = self.witnesses[k]
+                values[witness] = 1
+                values[witness - num_vars if witness > num_vars else witness + num_vars] = 0
@@ -1,17 +1,30 @@
-from utils import LubyGenerator
+from utils import LubyGenerator, EMA
 import numpy as np
 
+# GLUCOSE restarts: smoothing factors of the fast and slow LBD averages and of the trail size average
+GLUCOSE_FAST_ALPHA = 1. / 32
+GLUCOSE_SLOW_ALPHA = 1. / 16384
+GLUCOSE_TRAIL_ALPHA = 1. / 4096
+# restart when the fast LBD average exceeds the slow one by this factor
+GLUCOSE_MARGIN = 1.25
+# least number of conflicts between two restarts
+GLUCOSE_MIN_CONFLICTS = 50
+# a restart is blocked when the trail is longer than this factor times its average,
+# after so many conflicts
+GLUCOSE_BLOCK_FACTOR = 1.4
+GLUCOSE_BLOCK_CONFLICTS = 10000
+
 
 class Restarter:
 
     def __init__(self, restarter, decider="CHB", base=1024) -> None:
-        if restarter is None or restarter not in ["GEOMETRIC", "LUBY", "NO_RESTART"]:
-            raise ValueError('The restarter must be one from the list ["GEOMETRIC","LUBY","NO_RESTART"]')
+        if restarter is None or restarter not in ["GEOMETRIC", "LUBY", "GLUCOSE", "NO_RESTART"]:
+            raise ValueError('The restarter must be one from the list ["GEOMETRIC","LUBY","GLUCOSE","NO_RESTART"]')
 
         # This stores the number of conflicts before restart and is set to 0 at each restart
         self.conflicts_count = 0
         self.conflict_limit = 0
-        self.deciders = ["LRB", "CHB","VSIDS"]
+        self.deciders = ["LRB", "CHB","VSIDS","VMTF"]
         self.counts = [0] * len(self.deciders)
         self.expected_reward = [0] * len(self.deciders)
         self.last_arm = self.deciders.index(decider)
@@ -39,22 +52,53 @@ class Restarter:
             # Intialize the conflict limit with base * the first luby number fetched using the get_next_luby_number()
             self.conflict_limit = self.luby.get_next_luby_number()
 
+        if restarter == "GLUCOSE":
+            # If the GLUCOSE restart strategy is used, the restarts are driven by the LBD of the
+            # learned clauses instead of a conflict limit: a restart is done when the recent
+            # learned clauses (fast average) are worse than the average ones (slow average)
+            self.fast_lbd = EMA(GLUCOSE_FAST_ALPHA)
+            self.slow_lbd = EMA(GLUCOSE_SLOW_ALPHA)
+            self.trail_size = EMA(GLUCOSE_TRAIL_ALPHA)
+            self.total_conflicts = 0
+            self.blocked_restarts = 0
+
         # This stores the number of conflicts before restart and is set to 0 at each restart
         self.conflicts_count = 0
 
         # Set _restarter to the passed restart strategy
         self.restarter = restarter
 
-    def incre_conflict(self):
+    def incre_conflict(self, lbd=0, trail_size=0):
+        '''
+        Called at each conflict with the LBD of the learned clause and the size of the trail at the conflict
+        '''
         if self.restarter == "NO_RESTART":
             return
 
         self.conflicts_count += 1
 
+        if self.restarter == "GLUCOSE":
+            self.total_conflicts += 1
+            self.fast_lbd.update(lbd)
+            self.slow_lbd.update(lbd)
+            # block the restart if the solver is close to a full assignment (unusually long trail)
+            if (self.total_conflicts > GLUCOSE_BLOCK_CONFLICTS and self.conflicts_count >= GLUCOSE_MIN_CONFLICTS
+                    and trail_size > GLUCOSE_BLOCK_FACTOR * self.trail_size.value):
+                self.conflicts_count = 0
+                self.blocked_restarts += 1
+            self.trail_size.update(trail_size)
+
     def get_restart_flag(self):
         if self.restarter == "NO_RESTART":
             return False
 
+        if self.restarter == "GLUCOSE":
+            if (self.conflicts_count < GLUCOSE_MIN_CONFLICTS
+                    or self.fast_lbd.value <= GLUCOSE_MARGIN * self.slow_lbd.value):
+                return False
+            self.conflicts_count = 0
+            return True
+
         if self.conflicts_count < self.conflict_limit:
             return False
 
@@ -0,0 +1,133 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+# the learned clauses with at most so many literals and LBD are exported
+SHARE_SIZE_LIMIT = 8
+SHARE_LBD_LIMIT = 4
+# number of 32 bit integers in the ring buffer of every worker
+SHARE_RING_CAPACITY = 1 << 18
+# bytes of the header of a ring buffer: the 64 bit write position
+HEADER_BYTES = 8
+
+
+def create_rings(num_workers, capacity=SHARE_RING_CAPACITY):
+    ''' Create the ring buffers of a portfolio, the caller closes and unlinks them once the workers are done '''
+    rings = []
+    for _ in range(num_workers):
+        ring = shared_memory.SharedMemory(create=True, size=HEADER_BYTES + 4 * capacity)
+        np.ndarray((1,), dtype=np.int64, buffer=ring.buf)[0] = 0
+        rings.append(ring)
+    return rings
+
+
+class ClauseExchange:
+    """
+    Exchange of the short learned clauses between the workers of a portfolio, through one ring buffer
+    in shared memory per worker (see `create_rings()`), opened by their names in every worker.
+
+    Every ring has a single writer, its worker, and no lock. A ring holds a 64 bit header, the number
+    of integers written so far (the write position), then capacity 32 bit integers. A clause is
+    written as its size, its LBD and its literals at the write position modulo the capacity, and the
+    header is updated after the literals, so a reader never sees a clause being written. Every reader
+    keeps its own read position in every other ring and copies the integers from it to the write
+    position. If the writer got more than capacity integers ahead of the read position, before or
+    during the copy, the oldest integers were overwritten: the copy is dropped and the reader goes on
+    from the new write position.
+
+    A clause is exported (`export()`) if it has at most size_limit literals and its LBD is at most
+    lbd_limit. The hashes of the clauses exported and received by a worker are kept, and a clause
+    whose hash is known is neither exported nor received again.
+
+    The counters of the statistics: _share_exported, _share_received, _share_duplicates (clauses
+    filtered by their hash) and _share_dropped (copies dropped after an overwrite).
+    """
+
+    def __init__(self, names, index, stats, size_limit=SHARE_SIZE_LIMIT, lbd_limit=SHARE_LBD_LIMIT):
+        self.index = index
+        self.stats = stats
+        self.size_limit = size_limit
+        self.lbd_limit = lbd_limit
+        self.rings = []
+        self.heads = []
+        self.data = []
+        for name in names:
+            # the resource tracker is the one of the portfolio process, which unlinks the rings
+            ring = shared_memory.SharedMemory(name=name)
+            self.rings.append(ring)
+            self.heads.append(np.ndarray((1,), dtype=np.int64, buffer=ring.buf))
+            self.data.append(np.ndarray(((ring.size - HEADER_BYTES) // 4,), dtype=np.int32,
+                                        buffer=ring.buf, offset=HEADER_BYTES))
+        self.capacity = len(self.data[index])
+        self.read_positions = [int(head[0]) for head in self.heads]
+        self.hashes = set()
+
+    def export(self, clause, lbd):
+        ''' Write the learned clause to the ring of this worker if it is short enough and not known yet '''
+        if len(clause) > self.size_limit or lbd > self.lbd_limit:
+            return
+        key = hash(tuple(sorted(clause)))
+        if key in self.hashes:
+            self.stats._share_duplicates += 1
+            return
+        self.hashes.add(key)
+
+        record = [len(clause), lbd] + clause
+        head = self.heads[self.index]
+        data = self.data[self.index]
+        capacity = self.capacity
+        position = int(head[0])
+        start = position % capacity
+        end = start + len(record)
+        if end <= capacity:
+            data[start:end] = record
+        else:
+            split = capacity - start
+            data[start:] = record[:split]
+            data[:end - capacity] = record[split:]
+        # publish the clause
+        head[0] = position + len(record)
+        self.stats._share_exported += 1
+
+    def receive(self):
+        ''' The (clause, LBD) pairs written by the other workers since the last call, without the known clauses '''
+        clauses = []
+        capacity = self.capacity
+        for ring_index, head in enumerate(self.heads):
+            if ring_index == self.index:
+                continue
+            read_position = self.read_positions[ring_index]
+            write_position = int(head[0])
+            if write_position == read_position:
+                continue
+            self.read_positions[ring_index] = write_position
+            if write_position - read_position > capacity:
+                self.stats._share_dropped += 1
+                continue
+            data = self.data[ring_index]
+            chunk = data[np.arange(read_position, write_position) % capacity].tolist()
+            if int(head[0]) - read_position > capacity:
+                # overwritten during the copy
+                self.stats._share_dropped += 1
+                continue
+
+            i = 0
+            while i < len(chunk):
+                size = chunk[i]
+                lbd = chunk[i + 1]
+                clause = chunk[i + 2:i + 2 + size]
+                i += 2 + size
+                key = hash(tuple(sorted(clause)))
+                if key in self.hashes:
+                    self.stats._share_duplicates += 1
+                    continue
+                self.hashes.add(key)
+                self.stats._share_received += 1
+                clauses.append((clause, lbd))
+        return clauses
+
+    def close(self):
+        self.heads = []
+        self.data = []
+        for ring in self.rings:
+            ring.close()
+        self.rings = []
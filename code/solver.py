@@ -1,15 +1,32 @@
 from SAT import SAT
+from portfolio import Portfolio
+from cache import FormulaCache, DEFAULT_CACHE_DIR
 import argparse
 from utils import Test
 import time
 
 parser = argparse.ArgumentParser()
 parser.add_argument('-i','--input_file', default='examples/and1.cnf', type=str, help='path to input cnf file')
-parser.add_argument('-d','--decider',default='VSIDS',type=str,help='type of decider, should be one of ["VSIDS","LRB","CHB"]')
-parser.add_argument('-r','--restarter',default='LUBY',type=str,help='type of restarter, should be one of ["GEOMETRIC","LUBY","NO_RESTART"]')
+parser.add_argument('-d','--decider',default='VSIDS',type=str,help='type of decider, should be one of ["VSIDS","LRB","CHB","VMTF"]')
+parser.add_argument('-r','--restarter',default='LUBY',type=str,help='type of restarter, should be one of ["GEOMETRIC","LUBY","GLUCOSE","NO_RESTART"]')
 parser.add_argument('-b','--bve',default='False',type=str,help='Boolean flag indicating whether do bve or not, should be one of [""True","False"]')
 parser.add_argument('-t','--test',default='True',type=bool,help='Boolean flag indicating whether taking a test or not, should be one of [""True","False"]')
 parser.add_argument('--base',default='1024',type=int,help='Restart Base in Restarter')
+parser.add_argument('-m','--minimize',default='True',type=str,help='Boolean flag indicating whether minimize the learned clauses recursively or not, should be one of ["True","False"]')
+parser.add_argument('--bin_minimize',default='False',type=str,help='Boolean flag indicating whether strengthen the learned clauses with binary implications or not, should be one of ["True","False"]')
+parser.add_argument('--reduce_interval',default='2000',type=int,help='Number of conflicts before the first reduction of the learned clauses (growing by 300 after each one), 0 to keep all the learned clauses')
+parser.add_argument('--vsids_decay',default='0',type=float,help='Decay factor of the EVSIDS scores in (0, 1), e.g. 0.95, 0 for the additive VSIDS increment')
+parser.add_argument('--subsume',default='False',type=str,help='Boolean flag indicating whether subsume and strengthen the clauses before the search and the learned clauses at every reduction, should be one of ["True","False"]')
+parser.add_argument('--probe',default='False',type=str,help='Boolean flag indicating whether substitute the equivalent literals and probe the failed literals before the search, should be one of ["True","False"]')
+parser.add_argument('--inprocess',default='False',type=str,help='Boolean flag indicating whether simplify the formula periodically during the search (vivification, subsumption, probing), should be one of ["True","False"]')
+parser.add_argument('--bce',default='False',type=str,help='Boolean flag indicating whether remove the blocked clauses before the search, should be one of ["True","False"]')
+parser.add_argument('--simplify',default='True',type=str,help='Boolean flag indicating whether simplify the clauses with the new level 0 assignments during the search, should be one of ["True","False"]')
+parser.add_argument('--seed',default='0',type=int,help='Seed of the decider, a non zero seed randomizes the initial phases and score ties')
+parser.add_argument('--portfolio',default='1',type=int,help='Number of worker processes solving with different configurations, the first answer wins, 1 to solve in this process')
+parser.add_argument('--share',default='False',type=str,help='Boolean flag indicating whether the portfolio workers share their short learned clauses, should be one of ["True","False"]')
+parser.add_argument('--cache',default='False',type=str,help='Use the parsed formula cache, should be one of ["True","False","Clear"], "Clear" empties the cache and solves without it')
+parser.add_argument('--cache_dir',default=DEFAULT_CACHE_DIR,type=str,help='Directory of the parsed formula cache')
+parser.add_argument('--cache_size',default='1024',type=int,help='Size bound of the parsed formula cache in MB')
 
 
 args = parser.parse_args()
@@ -28,9 +45,25 @@ if __name__ == "__main__":
     bve_flag = args.bve
     base = args.base
 
+    # Parsed formula cache, None if not used
+    cache = None
+    if args.cache in ["True", "Clear"]:
+        cache = FormulaCache(args.cache_dir, args.cache_size * 2**20)
+        if args.cache == "Clear":
+            cache.clear()
+            cache = None
+
     # Create the SAT class and solve!
     # sat = SAT(decider_to_use, restarter_to_use, bve_flag)
-    sat = SAT(decider_to_use, restarter_to_use, bve_flag, base)
+    config = dict(decider=decider_to_use, restarter=restarter_to_use, bve_flag=bve_flag, base=base, cache=cache,
+                  minimize=args.minimize, bin_minimize=args.bin_minimize, reduce_interval=args.reduce_interval,
+                  vsids_decay=args.vsids_decay, subsume=args.subsume, probe=args.probe, inprocess=args.inprocess,
+                  bce=args.bce, simplify=args.simplify, seed=args.seed)
+    if args.portfolio > 1:
+        # the workers start from this configuration, see `Portfolio`
+        sat = Portfolio(args.portfolio, config, args.share)
+    else:
+        sat = SAT(**config)
     sat.solve(input_file_name)
 
     if args.test:
@@ -38,7 +71,7 @@ if __name__ == "__main__":
         print('\n')
         print("============================= TEST ===================================")
         if sat.stats._result == "SAT":
-            t = Test(sat.orig_sentence.values(), sat.assignment_dict,sat._num_vars)
+            t = Test(sat.orig_sentence, sat.assignment_dict,sat._num_vars)
             t.test_correctness()
             t.test_rep_assign()
             pass
@@ -0,0 +1,237 @@
+import time
+
+# clauses longer than this are not checked and not used to subsume or strengthen other clauses
+SUBSUMPTION_CLAUSE_LIMIT = 100
+
+
+class Subsumer:
+    """
+    Subsumption and self-subsuming resolution (strengthening) on the clauses of a `SAT` solver.
+
+    A clause C subsumes a clause D if every literal of C is in D, D is then deleted. If D holds
+    every literal of C but one, which it holds negated, the resolvent of C and D on that literal
+    subsumes D, and the negated literal is removed from D.
+
+    The clauses are checked from the shortest (forward subsumption): a clause D is compared with
+    the clauses C checked before it, then D is added to the occurrence list of its literal with
+    the fewest occurrences in the formula. Every clause is in one occurrence list only, so the
+    lists stay short, and only the clause being checked can be deleted or strengthened. A clause
+    C which subsumes or strengthens D is in the list of a literal of D or of its negation, so only
+    these lists are scanned, and a 64 bit signature of the variables of every clause filters out
+    most of the candidates before their literals are compared.
+
+    Before the search (learned=False) all the clauses are used, and a clause strengthened to one
+    literal becomes a level 0 unit. During the search (learned=True, from `SAT.reduce_db()`)
+    only the learned clauses are used and the watches are kept valid: the binary clauses and the
+    reason clauses are never removed or strengthened, and only the literals which are not
+    watched (not at the positions 0 and 1) are removed from a clause of at least 4 literals.
+    The removed literal may be the blocker of a watch of the clause, so the blockers of both its
+    watches are reset to the other watched literal. The deleted clauses must then be dropped from
+    the watch lists by the caller. With include_original=True the original clauses are used too,
+    to subsume and strengthen the learned clauses only.
+
+    The effort is counted in ticks, the clause ids scanned in the occurrence lists, and the pass
+    stops when budget ticks are spent (None for no bound).
+
+    Attributes:
+        occurs: occurs[lit] is the list of the ids of the checked clauses whose literal with the
+            fewest occurrences is lit
+        signatures: signatures[clause_id] is the signature of the clause
+        subsumed: number of clauses deleted
+        strengthened: number of literals removed
+        ticks: the effort spent
+    """
+
+    def __init__(self, solver, learned=False, include_original=False, budget=None):
+        self.solver = solver
+        self.sentence = solver.sentence
+        self.num_vars = solver._num_vars
+        self.learned = learned
+        self.include_original = include_original
+        self.budget = budget
+        self.ticks = 0
+        self.occurs = {}
+        self.signatures = [0] * len(self.sentence)
+        # marks[lit] == stamp while lit is in the clause being checked
+        self.marks = [0] * (2 * self.num_vars + 1)
+        self.stamp = 0
+        self.subsumed = 0
+        self.strengthened = 0
+
+    def signature(self, clause):
+        num_vars = self.num_vars
+        signature = 0
+        for lit in clause:
+            signature |= 1 << ((lit - num_vars if lit > num_vars else lit) & 63)
+        return signature
+
+    def run(self):
+        ''' Subsume and strengthen the clauses, returns the number of clauses deleted '''
+        start_time = time.time()
+        sentence = self.sentence
+        sizes = sentence.sizes
+        if self.learned and not self.include_original:
+            clause_ids = [clause_id for clause_id in sentence.ids()
+                          if sentence.is_learned(clause_id) and sizes[clause_id] <= SUBSUMPTION_CLAUSE_LIMIT]
+        else:
+            clause_ids = [clause_id for clause_id in sentence.ids() if sizes[clause_id] <= SUBSUMPTION_CLAUSE_LIMIT]
+
+        counts = [0] * (2 * self.num_vars + 1)
+        lits = sentence.lits
+        offsets = sentence.offsets
+        for clause_id in clause_ids:
+            offset = offsets[clause_id]
+            for lit in lits[offset:offset + sizes[clause_id]]:
+                counts[lit] += 1
+
+        occurs = self.occurs
+        self.ticks += len(clause_ids)
+        for clause_id in sorted(clause_ids, key=lambda clause_id: sizes[clause_id]):
+            if self.solver.stats._result == "UNSAT" or self.budget is not None and self.ticks > self.budget:
+                break
+            # with include_original the original clauses are only used to subsume the learned ones
+            if (not self.learned or sentence.is_learned(clause_id)) and not self.check(clause_id):
+                continue
+            best_lit = min(sentence.clause(clause_id), key=lambda lit: counts[lit])
+            occurs.setdefault(best_lit, []).append(clause_id)
+
+        stats = self.solver.stats
+        if self.learned:
+            stats._learned_subsumed += self.subsumed
+            stats._learned_strengthened += self.strengthened
+        else:
+            stats._subsumed_clauses += self.subsumed
+            stats._strengthened_literals += self.strengthened
+        stats._subsume_time += time.time() - start_time
+        return self.subsumed
+
+    def check(self, clause_id):
+        '''
+        Subsume or strengthen the clause clause_id with the clauses checked before it.
+        Returns False if the clause was deleted.
+        '''
+        sentence = self.sentence
+        sizes = sentence.sizes
+        signatures = self.signatures
+        occurs = self.occurs
+        marks = self.marks
+        num_vars = self.num_vars
+        empty = ()
+
+        clause = sentence.clause(clause_id)
+        while True:
+            size = len(clause)
+            signature = self.signature(clause)
+            signatures[clause_id] = signature
+            mask = ~signature
+            self.stamp += 1
+            stamp = self.stamp
+            for lit in clause:
+                marks[lit] = stamp
+
+            removed = None
+            for lit in clause:
+                negation = lit - num_vars if lit > num_vars else lit + num_vars
+                for watched in (lit, negation):
+                    # the signature filter first, it drops most of the candidates
+                    occurrences = occurs.get(watched, empty)
+                    self.ticks += len(occurrences)
+                    candidates = [other_id for other_id in occurrences if not signatures[other_id] & mask]
+                    for other_id in candidates:
+                        if sizes[other_id] > size:
+                            continue
+                        removed = self.compare(sentence.clause(other_id), stamp)
+                        if removed is None:
+                            continue
+                        if removed == 0:
+                            if not self.can_delete(clause_id):
+                                removed = None
+                                continue
+                            if self.learned and sentence.is_learned(other_id):
+                                # the subsuming clause takes over the tier of the deleted one
+                                learned_db = self.solver._learned_db
+                                learned_db.bump(other_id, learned_db.lbd[clause_id])
+                            self.delete(clause_id)
+                            return False
+                        if not self.can_strengthen(clause_id, removed):
+                            removed = None
+                            continue
+                        break
+                    if removed is not None:
+                        break
+                if removed is not None:
+                    break
+
+            if removed is None:
+                return True
+            if not self.strengthen(clause_id, removed):
+                return False
+            # check the shorter clause again
+            clause = sentence.clause(clause_id)
+
+    def compare(self, other, stamp):
+        '''
+        Returns 0 if the clause other subsumes the marked clause, the literal to remove from the marked
+        clause if other strengthens it, None otherwise.
+        '''
+        num_vars = self.num_vars
+        marks = self.marks
+        removed = 0
+        for lit in other:
+            if marks[lit] == stamp:
+                continue
+            negation = lit - num_vars if lit > num_vars else lit + num_vars
+            if removed == 0 and marks[negation] == stamp:
+                removed = negation
+            else:
+                return None
+        return removed
+
+    def can_delete(self, clause_id):
+        if not self.learned:
+            return True
+        sentence = self.sentence
+        return sentence.is_learned(clause_id) and sentence.sizes[clause_id] > 2 and not self.solver.is_locked(clause_id)
+
+    def can_strengthen(self, clause_id, lit):
+        if not self.learned:
+            return True
+        sentence = self.sentence
+        offset = sentence.offsets[clause_id]
+        return sentence.is_learned(clause_id) and sentence.sizes[clause_id] > 3 \
+            and lit != sentence.lits[offset] and lit != sentence.lits[offset + 1]
+
+    def delete(self, clause_id):
+        self.sentence.delete(clause_id)
+        if self.learned:
+            self.solver._learned_db.remove(clause_id)
+        self.subsumed += 1
+
+    def strengthen(self, clause_id, lit):
+        ''' Remove lit from the clause clause_id, returns False if the clause became a unit and was deleted '''
+        sentence = self.sentence
+        sentence.remove_literal(clause_id, lit)
+        if self.learned:
+            self.reset_blockers(clause_id)
+            self.solver._learned_db.shorten(clause_id, sentence.sizes[clause_id])
+        self.strengthened += 1
+        if sentence.sizes[clause_id] == 1:
+            unit = sentence.clause(clause_id)[0]
+            self.delete(clause_id)
+            self.subsumed -= 1
+            self.solver.add_unit(unit)
+            return False
+        return True
+
+    def reset_blockers(self, clause_id):
+        ''' Set the blockers of the two watches of the clause (of at least 3 literals) to the other watched literal '''
+        sentence = self.sentence
+        offset = sentence.offsets[clause_id]
+        lit1 = sentence.lits[offset]
+        lit2 = sentence.lits[offset + 1]
+        for lit, other in ((lit1, lit2), (lit2, lit1)):
+            watch_list = self.solver.l2c_watch[lit]
+            for i in range(0, len(watch_list), 2):
+                if watch_list[i] == clause_id:
+                    watch_list[i + 1] = other
+                    break
@@ -15,21 +15,81 @@ class Statistics:
         self._num_orig_clauses = 0
         self._num_clauses = 0
         self._num_learned_clauses = 0
+        self._learned_literals_before = 0
+        self._learned_literals_after = 0
+        self._minimized_literals = 0
+        self._db_reductions = 0
+        self._deleted_clauses = 0
+        self._live_clauses_history = []
+        self._simplify_flag = False
+        self._simplify_calls = 0
+        self._simplify_clauses = 0
+        self._simplify_literals = 0
+        self._simplify_history = []
+        self._simplify_time = 0
         self._num_decisions = 0
         self._num_implications = 0
         self._start_time = 0
         self._read_time = 0
+        self._parse_time = 0
+        self._parse_bytes = 0
+        self._cache_status = ""
         self._complete_time = 0
         self._bcp_time = 0
         self._decide_time = 0
         self._analyze_time = 0
         self._backtrack_time = 0
+        self._reduce_time = 0
         self._restarts = 0
+        self._blocked_restarts = 0
+        self._switch_time = 0
+        self._blocker_hits = 0
+        self._binary_implications = 0
+        self._clause_visits = 0
+        self._bytes_per_clause = 0
         self._bve_flag = False
         self._bve_vars = 0
         self._bve_add_clauses = 0
         self._bve_rm_clauses = 0
+        self._bve_subsumed = 0
         self._bve_time = 0
+        self._subsume_flag = False
+        self._subsumed_clauses = 0
+        self._strengthened_literals = 0
+        self._learned_subsumed = 0
+        self._learned_strengthened = 0
+        self._subsume_time = 0
+        # the worker which found the answer, the wall time and a summary of every worker of a portfolio
+        self._portfolio_winner = None
+        self._portfolio_time = 0
+        self._portfolio_workers = []
+        # clause sharing between the workers of a portfolio, see `ClauseExchange`
+        self._share_flag = False
+        self._share_exported = 0
+        self._share_received = 0
+        self._share_imported = 0
+        self._share_useful = 0
+        self._share_duplicates = 0
+        self._share_dropped = 0
+        self._bce_flag = False
+        self._bce_clauses = 0
+        self._bce_ticks = 0
+        self._bce_time = 0
+        self._probe_flag = False
+        self._substituted_vars = 0
+        self._failed_literals = 0
+        self._probe_time = 0
+        self._inprocess_rounds = 0
+        self._inprocess_time = 0
+        self._vivify_ticks = 0
+        self._vivified_clauses = 0
+        self._vivified_literals = 0
+        self._subsume_ticks = 0
+        self._inprocess_subsumed = 0
+        self._inprocess_strengthened = 0
+        self._probe_ticks = 0
+        self._inprocess_substituted = 0
+        self._inprocess_failed = 0
 
     def print_stats(self):
         print(
@@ -38,25 +98,105 @@ class Statistics:
         print("Solving formula from file: ", self._input_file)
         print("Vars:{}, Original Clauses:{}, Finally Stored Clauses:{}".format(
             str(self._num_vars), str(self._num_orig_clauses),
-            str(self._num_clauses-self._bve_rm_clauses)))
+            str(self._num_clauses)))
         print("Input Reading Time: ", self._read_time - self._start_time)
+        if self._cache_status:
+            print("Formula cache: ", self._cache_status)
+        if self._parse_time > 0:
+            print("Parse throughput: {:.2f} MB/s".format(
+                self._parse_bytes / self._parse_time / 1e6))
         if self._bve_flag:
             print("--------------- Preprocesscing ----------------")
             print("Var eliminated: ",self._bve_vars)
-            print("Original clauses deleted: ",self._bve_rm_clauses)
+            print("Clauses deleted: ",self._bve_rm_clauses)
             print("New clauses added: ",self._bve_add_clauses)
+            print("Clauses subsumed by resolvents: ",self._bve_subsumed)
             print("BVE time: ",self._bve_time)
+        if self._subsume_flag:
+            print("--------------- Subsumption ----------------")
+            print("Clauses subsumed: ",self._subsumed_clauses)
+            print("Literals strengthened: ",self._strengthened_literals)
+            print("Learned clauses subsumed: ",self._learned_subsumed)
+            print("Learned literals strengthened: ",self._learned_strengthened)
+            print("Subsumption time: ",self._subsume_time)
+        if self._bce_flag:
+            print("--------------- Blocked Clauses ----------------")
+            print("Blocked clauses removed: ",self._bce_clauses)
+            print("BCE ticks: ",self._bce_ticks)
+            print("BCE time: ",self._bce_time)
+        if self._probe_flag:
+            print("--------------- Probing ----------------")
+            print("Vars substituted by equivalent literals: ",self._substituted_vars)
+            print("Failed literals: ",self._failed_literals)
+            print("Probing time: ",self._probe_time)
+        if self._inprocess_rounds > 0:
+            print("--------------- Inprocessing ----------------")
+            print("Rounds: {}, time: {}".format(self._inprocess_rounds, self._inprocess_time))
+            print("Vivification: ticks {}, clauses shortened {}, literals removed {}".format(
+                self._vivify_ticks, self._vivified_clauses, self._vivified_literals))
+            print("Subsumption: ticks {}, learned clauses subsumed {}, literals strengthened {}".format(
+                self._subsume_ticks, self._inprocess_subsumed, self._inprocess_strengthened))
+            print("Probing: ticks {}, vars substituted {}, failed literals {}".format(
+                self._probe_ticks, self._inprocess_substituted, self._inprocess_failed))
+        if self._portfolio_workers:
+            print("--------------- Portfolio ----------------")
+            if self._portfolio_winner is not None:
+                print("Winner: worker {worker} ({decider}, {restarter}, base {base}, seed {seed})".format(
+                    **self._portfolio_workers[self._portfolio_winner]))
+            print("Portfolio time: ", self._portfolio_time)
+            for worker in self._portfolio_workers:
+                line = "Worker {worker} ({decider}, {restarter}, base {base}, seed {seed}): {result}".format(**worker)
+                if "time" in worker:
+                    line += ", time {time:.2f}s, conflicts {conflicts}, decisions {decisions}, " \
+                            "implications {implications}, restarts {restarts}".format(**worker)
+                if "exported" in worker:
+                    line += ", shared clauses exported {exported}, imported {imported}, useful {useful}".format(**worker)
+                print(line)
+        if self._share_flag:
+            print("--------------- Clause sharing ----------------")
+            print("Clauses exported: {}, received: {}, imported: {}, useful: {}".format(
+                self._share_exported, self._share_received, self._share_imported, self._share_useful))
+            print("Duplicates filtered: {}, ring overruns: {}".format(self._share_duplicates, self._share_dropped))
         print("-------------------------------")
         print("Restarts: ", self._restarts)
+        if self._blocked_restarts > 0:
+            print("Blocked restarts: ", self._blocked_restarts)
+        if self._restarts > 0:
+            print("Heuristic switch time per restart: {:.6f}s".format(self._switch_time / self._restarts))
         print("Learned clauses: ", self._num_learned_clauses)
+        if self._num_learned_clauses > 0:
+            print("Average learned clause size before/after minimization: {:.2f}/{:.2f}".format(
+                self._learned_literals_before / self._num_learned_clauses,
+                self._learned_literals_after / self._num_learned_clauses))
+            print("Literals removed by minimization: ", self._minimized_literals)
+        print("Learned clause DB reductions: {}, deleted learned clauses: {}".format(
+            self._db_reductions, self._deleted_clauses))
+        if self._live_clauses_history:
+            print("Live clauses over time (conflicts: clauses): " + ", ".join(
+                "{}: {}".format(conflicts, clauses) for conflicts, clauses in self._live_clauses_history))
+        if self._simplify_flag:
+            print("Level 0 simplifications: {}, clauses removed: {}, literals removed: {}".format(
+                self._simplify_calls, self._simplify_clauses, self._simplify_literals))
+            if self._simplify_history:
+                print("Removed per simplification (clauses/literals): " + ", ".join(
+                    "{}/{}".format(clauses, literals) for clauses, literals in self._simplify_history))
+        print("Clause memory per clause (bytes): {:.1f}".format(self._bytes_per_clause))
         print("Decisions made: ", self._num_decisions)
         print("Implications made: ", self._num_implications)
+        if self._bcp_time > 0:
+            print("Propagations per second: ", int(self._num_implications / self._bcp_time))
+        if self._num_implications > 0:
+            print("Implications from binary clauses: {:.1f}%".format(
+                100 * self._binary_implications / self._num_implications))
+        print("Watch blocker hits: {}, clause visits: {}".format(self._blocker_hits, self._clause_visits))
         print("Time taken: ", self._complete_time - self._start_time)
         print("----------- Time breakup ----------------------")
         print("BCP Time: ", self._bcp_time)
         print("Decide Time: ", self._decide_time)
         print("Conflict Analyze Time: ", self._analyze_time)
         print("Backtrack Time: ", self._backtrack_time)
+        print("Reduce DB Time: ", self._reduce_time)
+        print("Simplify Time: ", self._simplify_time)
         print("-------------------------------")
         print("RESULT: ", self._result)
         print("Statistics stored in file: ", self._output_statistics_file)
@@ -69,6 +209,26 @@ class Statistics:
         )
 
 
+class EMA:
+    """
+    Exponential moving average with smoothing factor alpha.
+    While fewer than 1/alpha values were seen, it is the plain average of the values,
+    so the first values are not biased towards the initial 0.
+    """
+
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self.value = 0.
+        self.count = 0
+
+    def update(self, y):
+        self.count += 1
+        beta = 1. / self.count
+        if beta < self.alpha:
+            beta = self.alpha
+        self.value += beta * (y - self.value)
+
+
 class LubyGenerator:
     def __init__(self,base) -> None:
         # List to store the luby numbers
@@ -102,67 +262,80 @@ class LubyGenerator:
 
 
 class PriorityQueue:
+    """
+    Indexed binary max heap of the keys 1..n, ordered by their scores.
+
+    The heap is kept in flat lists instead of one [priority, element] list per entry:
+        heap: heap[i] is the key at position i of the heap (only heap[:size] is used)
+        scores: scores[key] is the current score of the key
+        indices: indices[key] is the position of the key in the heap, -1 if it is not in the heap
+    Keys are sifted iteratively, moving the parents (or children) down (or up) and writing
+    the sifted key only once at its final position.
+    """
 
-    def __init__(self,start_list):
-        # The first element is removed as it is not related
-        # to any variable or literal
-        self.size = len(start_list)-1
-        temp = start_list[1:]
-
-        # Array that stores the heap
-        # Each element in the heap is of the form
-        # [priority,element] where priority is the
-        # priority of the element and the heap is
-        # max heap with respect to the priority scores
-        self.heap = []
-
-        # Array that maps elements to their indices in the heap
-        self.indices = []
-
-        ctr = 1
-        for x in temp:
-            self.heap.append([x,ctr])
-            self.indices.append(ctr-1)
-            ctr += 1
-
-        for i in range(int(self.size/2)-1,-1,-1):
-            self.heapify(i)
-    
-    def swap(self,ind1,ind2):
-        temp = self.heap[ind1]
-        self.heap[ind1] = self.heap[ind2]
-        self.heap[ind2] = temp
-
-        p1 = self.heap[ind1][1]
-        p1 -= 1
-        p2 = self.heap[ind2][1]
-        p2 -= 1
-        temp = self.indices[p1]
-        self.indices[p1]=self.indices[p2]
-        self.indices[p2]=temp
-
-    def heapify(self,node_index):
-        maxp = self.heap[node_index][0]
-
-        left_index = 2*node_index+1
-        if left_index<self.size:
-            pr = self.heap[left_index][0]
-            if pr>maxp:
-                maxp = pr
-        
-        right_index = 2*node_index+2
-        if right_index<self.size:
-            pr = self.heap[right_index][0]
-            if pr>maxp:
-                maxp = pr
-        
-        if maxp != self.heap[node_index][0]:
-            if left_index<self.size and maxp == self.heap[left_index][0]:
-                self.swap(left_index,node_index)
-                self.heapify(left_index)
-            else:
-                self.swap(right_index,node_index)
-                self.heapify(right_index)
+    def __init__(self,start_list,keys=None):
+        # start_list[key] is the initial score of key, the first element
+        # is not related to any variable or literal.
+        # keys are the keys initially in the heap, all of them if None
+        num_keys = len(start_list)-1
+        if keys is None:
+            keys = range(1, num_keys+1)
+        self.scores = list(start_list)
+        self.heap = list(keys)
+        self.size = len(self.heap)
+        self.indices = [-1] * (num_keys+1)
+        for pos in range(self.size):
+            self.indices[self.heap[pos]] = pos
+        self.heap += [0] * (num_keys-self.size)
+
+        # bottom-up build, O(n)
+        for i in range(self.size//2-1,-1,-1):
+            self.sift_down(i)
+
+    def sift_up(self,pos):
+        heap = self.heap
+        scores = self.scores
+        indices = self.indices
+        key = heap[pos]
+        score = scores[key]
+        while pos > 0:
+            parent = (pos-1) >> 1
+            parent_key = heap[parent]
+            if scores[parent_key] >= score:
+                break
+            heap[pos] = parent_key
+            indices[parent_key] = pos
+            pos = parent
+        heap[pos] = key
+        indices[key] = pos
+
+    def sift_down(self,pos):
+        heap = self.heap
+        scores = self.scores
+        indices = self.indices
+        size = self.size
+        key = heap[pos]
+        score = scores[key]
+        while True:
+            child = 2*pos+1
+            if child >= size:
+                break
+            child_key = heap[child]
+            child_score = scores[child_key]
+            if child+1 < size:
+                right_key = heap[child+1]
+                right_score = scores[right_key]
+                if right_score > child_score:
+                    child += 1
+                    child_key = right_key
+                    child_score = right_score
+            if child_score <= score:
+                break
+            heap[pos] = child_key
+            indices[child_key] = pos
+            pos = child
+        heap[pos] = key
+        indices[key] = pos
 
     def get_top(self):
         # If queue is empty, return -1
@@ -170,63 +343,63 @@ class PriorityQueue:
             return -1
 
         # Top element is the element in heap[0]
-        top_element = self.heap[0][1]
-
-        self.swap(0,self.size-1)
-        self.indices[self.heap[self.size-1][1]-1]=-1
+        top_element = self.heap[0]
+        self.indices[top_element] = -1
         self.size -= 1
-        self.heapify(0)
+        if self.size > 0:
+            # move the last key to the root
+            self.heap[0] = self.heap[self.size]
+            self.sift_down(0)
 
         return top_element
 
     def increase_update(self,key,value):
-        if self.indices[key-1] == -1:
+        # add value (which may be negative) to the score of key, if it is in the heap
+        pos = self.indices[key]
+        if pos == -1:
             return
-        
-        pos = self.indices[key-1]
-        
-        self.heap[pos][0] += value
-
-        par=pos
-        while par!=0:
-            temp = par
-            par = int((par-1)/2)
-            if self.heap[temp][0] > self.heap[par][0]:
-                self.swap(temp,par)
-            else:
-                break
-    
+
+        self.scores[key] += value
+        if value > 0:
+            self.sift_up(pos)
+        elif value < 0:
+            self.sift_down(pos)
+
     def remove(self,key):
-        if self.indices[key-1] == -1:
+        pos = self.indices[key]
+        if pos == -1:
             return
 
-        pos = self.indices[key-1]
-        this_node_pr = self.heap[pos][0]
-        final_node_pr = self.heap[self.size-1][0]
-        self.swap(pos,self.size-1)
+        self.indices[key] = -1
         self.size -= 1
-        self.indices[key-1] = -1
-
-        if final_node_pr > this_node_pr:
-            par = pos
-            while par!=0:
-                temp = par
-                par = int((par-1)/2)
-                if self.heap[temp][0] > self.heap[par][0]:
-                    self.swap(temp,par)
-                else:
-                    break
-        elif this_node_pr > final_node_pr:
-            self.heapify(pos)
+        if pos == self.size:
+            return
+
+        # move the last key to the free position
+        last_key = self.heap[self.size]
+        self.heap[pos] = last_key
+        if self.scores[last_key] > self.scores[key]:
+            self.sift_up(pos)
+        else:
+            self.sift_down(pos)
+
+    def rescale(self,factor):
+        # multiply all the scores by factor > 0, which keeps their order
+        self.scores = [score*factor for score in self.scores]
 
     def add(self,key,value):
-        # Push the key to the last position with priority 0
-        self.heap[self.size] = [0,key]
-        self.indices[key-1] = self.size
+        # insert key with the score value, a key already in the heap gets the new score
+        self.scores[key] = value
+        pos = self.indices[key]
+        if pos != -1:
+            self.sift_up(pos)
+            self.sift_down(self.indices[key])
+            return
 
+        self.heap[self.size] = key
         self.size += 1
+        self.sift_up(self.size-1)
 
-        self.increase_update(key,value)
 
 class Test():
     def __init__(self,sentence,_assignment,num_vars) -> None: